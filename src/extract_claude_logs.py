@@ -7,7 +7,7 @@ conversations locally in ~/.claude/projects/ and exports them as clean,
 readable markdown files.
 """
 
-import argparse
+import heapq
 import json
 import os
 import platform
@@ -15,19 +15,564 @@ import re
 import subprocess
 import sys
 import tempfile
-from datetime import datetime
+from collections import defaultdict
+from datetime import date, datetime
+from functools import lru_cache, partial
+from itertools import chain
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union, Any
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union, Any
+
+# Optional fast JSON decoder; falls back to the stdlib parser
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-import bleach
-import markdown
+
+def _json_loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON with orjson when installed, retrying with json.loads on what it rejects.
+
+    orjson refuses lone surrogate escapes (truncated emoji in real logs) and
+    NaN/Infinity literals, which the stdlib parser accepts.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+# Session files are read sequentially; a 1 MiB buffer keeps read syscalls low on large logs
+_READ_BUFFER_SIZE = 1024 * 1024
+
+# A preview stops decoding at the first user message, so a handful of files is
+# faster serially than the cost of starting worker processes
+_PARALLEL_PREVIEW_MIN_FILES = 32
+# Exports parse and render every message, so a process pool pays off much sooner
+_PARALLEL_EXPORT_MIN_FILES = 4
+
+# Cheap byte-level prefilters: lines that cannot be a handled entry (summaries,
+# file-history snapshots, ...) are dropped before paying for a full JSON parse.
+# False positives are fine (nested "type" keys also match); the handler lookup on
+# the parsed entry still decides.
+_MESSAGE_TYPE_RE = re.compile(rb'"type"\s*:\s*"(?:user|assistant|progress)"')
+_DETAILED_TYPE_RE = re.compile(
+    rb'"type"\s*:\s*"(?:user|assistant|progress|tool_use|tool_result|system)"'
+)
+# Previews only look at user entries
+_USER_TYPE_RE = re.compile(rb'"type"\s*:\s*"user"')
+
+# XML-like tags (command wrappers etc.) stripped from session previews
+_XML_TAG_RE = re.compile(r'<[^>]+>')
 
 try:
     from utils.html_utils import escape_html
-    from utils.ui_utils import is_human_user_message, get_nav_label, build_sidebar_nav
+    from utils.ui_utils import (
+        is_human_user_message, get_nav_label, build_sidebar_nav, format_subagent_display
+    )
 except ImportError:
     from .utils.html_utils import escape_html
-    from .utils.ui_utils import is_human_user_message, get_nav_label, build_sidebar_nav
+    from .utils.ui_utils import (
+        is_human_user_message, get_nav_label, build_sidebar_nav, format_subagent_display
+    )
+
+_IMAGE_HTML = (
+    '<div class="content-image">'
+    '<img src="{src}" alt="Screenshot" style="max-width: 100%; height: auto;" />'
+    '</div>'
+)
+# Same markup split around the src value, so large base64 payloads are copied only once
+_IMAGE_HTML_PREFIX, _IMAGE_HTML_SUFFIX = _IMAGE_HTML.split("{src}")
+_BASE64_DATA_URL_PREFIX = _IMAGE_HTML_PREFIX + "data:image/jpeg;base64,"
+# Base64 alphabet (plus line breaks); payloads matching it need no HTML escaping
+_BASE64_RE = re.compile(r"[A-Za-z0-9+/=\r\n]*")
+# data: URLs carrying a base64 payload; like _BASE64_RE, a full match is safe unescaped
+_BASE64_DATA_URL_RE = re.compile(r"data:[A-Za-z0-9.+/-]+;base64,[A-Za-z0-9+/=\r\n]*")
+_IMAGE_PLACEHOLDER_HTML = '<div class="content-image-placeholder">[Image Data]</div>'
+
+# Per-role headings used by the exporters and the terminal viewer. Subagent entries
+# are templates filled with the agent label; unknown roles fall back to the role name.
+_MARKDOWN_ROLE_HEADINGS = {
+    "user": "## 👤 User",
+    "assistant": "## 🤖 Claude",
+    "subagent_user": "## 🤖 Subagent ({subagent}) - User",
+    "subagent_assistant": "## 🤖 Subagent ({subagent}) - Assistant",
+    "tool_use": "### 🔧 Tool Use",
+    "tool_result": "### 📤 Tool Result",
+    "system": "### ℹ️ System",
+}
+# Roles whose token usage is shown in the markdown export
+_MARKDOWN_USAGE_ROLES = frozenset(("assistant", "subagent_assistant"))
+_HTML_ROLE_LABELS = {
+    "user": "👤 User",
+    "assistant": "🤖 Claude",
+    "subagent_user": "🤖 Subagent ({subagent}) - User",
+    "subagent_assistant": "🤖 Subagent ({subagent}) - Assistant",
+    "tool_use": "🔧 Tool Use",
+    "tool_result": "📤 Tool Result",
+    "system": "ℹ️ System",
+}
+# ANSI clear screen + cursor home, written before each pager page
+_CLEAR_SCREEN = "\033[2J\033[H"
+_TERMINAL_RULE = "─" * 40
+_TERMINAL_ROLE_HEADERS = {
+    "user": f"\n{_TERMINAL_RULE}\n👤 HUMAN:\n{_TERMINAL_RULE}",
+    "human": f"\n{_TERMINAL_RULE}\n👤 HUMAN:\n{_TERMINAL_RULE}",
+    "assistant": f"\n{_TERMINAL_RULE}\n🤖 CLAUDE:\n{_TERMINAL_RULE}",
+    "subagent_user": f"\n{_TERMINAL_RULE}\n🤖 SUBAGENT ({{subagent}}) USER:\n{_TERMINAL_RULE}",
+    "subagent_assistant": (
+        f"\n{_TERMINAL_RULE}\n🤖 SUBAGENT ({{subagent}}) ASSISTANT:\n{_TERMINAL_RULE}"
+    ),
+    "tool_use": "\n🔧 TOOL USE:",
+    "tool_result": "\n📤 TOOL RESULT:",
+    "system": "\nℹ️ SYSTEM:",
+}
+# Answers accepted as "yes" at the (y/N) prompts
+_AFFIRMATIVE = frozenset({"y", "yes"})
+# Per-session progress lines printed by extract_multiple (and --extract parsing)
+_MSG_OK = "✅ {success}/{total}: {name} ({count} messages)"
+_MSG_SKIP = "⏭️  Skipped session {number} (no conversation)"
+_MSG_INVALID = "❌ Invalid session number: {number}"
+
+# Static head of the HTML export (stylesheet included); only the <title> between the
+# two halves varies per session, so the ~10 KB of CSS is not re-formatted per export
+_HTML_HEAD_PREFIX = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Claude Conversation - """
+_HTML_HEAD_SUFFIX = """</title>
+    <style>
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            max-width: 1400px;
+            margin: 0 auto;
+            padding: 20px;
+            background: #f5f5f5;
+        }
+        .header {
+            background: white;
+            padding: 20px;
+            border-radius: 8px;
+            margin-bottom: 20px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }
+        h1 {
+            color: #2c3e50;
+            margin: 0 0 10px 0;
+        }
+        .metadata {
+            color: #666;
+            font-size: 0.9em;
+        }
+        .message {
+            background: white;
+            padding: 15px 20px;
+            margin-bottom: 15px;
+            border-radius: 8px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }
+        .user {
+            border-left: 4px solid #3498db;
+        }
+        .assistant {
+            border-left: 4px solid #2ecc71;
+        }
+        .tool_use {
+            border-left: 4px solid #f39c12;
+            background: #fffbf0;
+        }
+        .tool_result {
+            border-left: 4px solid #e74c3c;
+            background: #fff5f5;
+        }
+        .system {
+            border-left: 4px solid #95a5a6;
+            background: #f8f9fa;
+        }
+        .subagent_user, .subagent_assistant {
+            border-left: 4px solid #9b59b6;
+            background: #f8f4ff;
+        }
+        .role {
+            font-weight: bold;
+            margin-bottom: 10px;
+            display: flex;
+            align-items: center;
+        }
+        .content {
+            white-space: pre-wrap;
+            word-wrap: break-word;
+        }
+        .content-text {
+            margin: 5px 0;
+        }
+        .markdown-body {
+            white-space: normal;
+            word-wrap: break-word;
+        }
+        .markdown-body p { margin: 0.5em 0; }
+        .markdown-body ul, .markdown-body ol { margin: 0.5em 0; padding-left: 1.5em; }
+        .markdown-body h1, .markdown-body h2, .markdown-body h3, .markdown-body h4, .markdown-body h5, .markdown-body h6 {
+            margin: 0.75em 0 0.5em; font-weight: bold;
+        }
+        .markdown-body h1 { font-size: 1.3em; }
+        .markdown-body h2 { font-size: 1.15em; }
+        .markdown-body h3 { font-size: 1.05em; }
+        .markdown-body pre { margin: 0.5em 0; }
+        .markdown-body blockquote { margin: 0.5em 0; padding-left: 1em; border-left: 3px solid #ccc; color: #666; }
+        .markdown-body table { border-collapse: collapse; margin: 0.5em 0; }
+        .markdown-body th, .markdown-body td { border: 1px solid #ddd; padding: 4px 8px; }
+        .markdown-body a { color: #3498db; }
+        .markdown-body hr { margin: 1em 0; border: none; border-top: 1px solid #ddd; }
+        .thinking-content.markdown-body {
+            white-space: normal;
+            font-family: inherit;
+        }
+        .tool-result-content.markdown-body {
+            white-space: normal;
+            font-family: inherit;
+        }
+        .content-thinking {
+            background: #f0f7ff;
+            border-left: 3px solid #4a90e2;
+            padding: 10px;
+            margin: 10px 0;
+            border-radius: 4px;
+        }
+        .thinking-header {
+            font-weight: bold;
+            color: #2c5aa0;
+            margin-bottom: 5px;
+            font-size: 0.9em;
+        }
+        .thinking-content {
+            white-space: pre-wrap;
+            font-family: 'Courier New', monospace;
+            font-size: 0.9em;
+            color: #333;
+        }
+        .content-tool-use {
+            background: #fffbf0;
+            padding: 10px;
+            margin: 10px 0;
+            border-radius: 4px;
+        }
+        .tool-name {
+            font-weight: bold;
+            color: #856404;
+            margin-bottom: 5px;
+        }
+        .tool-input {
+            background: #f4f4f4;
+            padding: 10px;
+            border-radius: 4px;
+            overflow-x: auto;
+            margin: 0;
+        }
+        .content-image {
+            margin: 10px 0;
+            text-align: center;
+        }
+        .content-image img {
+            max-width: 100%;
+            height: auto;
+            border-radius: 4px;
+            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+        }
+        .content-image-placeholder {
+            background: #f4f4f4;
+            padding: 20px;
+            border-radius: 4px;
+            text-align: center;
+            color: #666;
+            font-style: italic;
+        }
+        .content-tool-reference {
+            background: #fff9e6;
+            padding: 8px;
+            border-radius: 4px;
+            margin: 5px 0;
+        }
+        .tool-ref-label {
+            font-weight: bold;
+            color: #856404;
+        }
+        .content-tool-result {
+            background: #fff5f5;
+            padding: 10px;
+            margin: 10px 0;
+            border-radius: 4px;
+            border-left: 3px solid #e74c3c;
+        }
+        .tool-result-header {
+            font-weight: bold;
+            color: #c0392b;
+            margin-bottom: 5px;
+            font-size: 0.9em;
+        }
+        .tool-result-content {
+            white-space: pre-wrap;
+            font-family: 'Courier New', monospace;
+            font-size: 0.9em;
+            color: #333;
+        }
+        pre {
+            background: #f4f4f4;
+            padding: 10px;
+            border-radius: 4px;
+            overflow-x: auto;
+        }
+        code {
+            background: #f4f4f4;
+            padding: 2px 4px;
+            border-radius: 3px;
+            font-family: 'Courier New', monospace;
+        }
+        .token-usage {
+            margin-top: 8px;
+            font-size: 0.82em;
+            color: #666;
+        }
+        .message-accordion { margin-top: 8px; }
+        .message-accordion summary {
+            cursor: pointer;
+            font-weight: 600;
+            color: #555;
+            padding: 4px 0;
+        }
+        .app-layout { display: flex; gap: 20px; }
+        .sidebar {
+            position: sticky;
+            top: 20px;
+            width: 220px;
+            flex-shrink: 0;
+            max-height: calc(100vh - 40px);
+            overflow-y: auto;
+            background: white;
+            padding: 15px;
+            border-radius: 8px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }
+        .sidebar .nav-header { font-weight: bold; margin-bottom: 10px; color: #2c3e50; }
+        .sidebar .nav-link {
+            display: block;
+            padding: 6px 8px;
+            margin: 4px 0;
+            border-radius: 4px;
+            border-left: 3px solid transparent;
+            color: #333;
+            text-decoration: none;
+            font-size: 0.85em;
+            white-space: nowrap;
+            overflow: hidden;
+            text-overflow: ellipsis;
+        }
+        .sidebar .nav-link:hover { background: #f0f0f0; }
+        .sidebar .nav-link.active {
+            border-left-color: #3498db;
+            background: #e8f4fc;
+            font-weight: 600;
+        }
+        .content-area { flex: 1; max-width: 900px; }
+    </style>
+</head>
+<body>
+"""
+
+# Static tail of the HTML export: the scroll-spy script for the sidebar nav
+_HTML_FOOTER = """    <script>
+(function() {
+    const links = document.querySelectorAll('.sidebar .nav-link');
+    const messages = document.querySelectorAll('.message[id^="msg-"]');
+    const headerOffset = 80;
+    let lastActiveIdx = -1;
+    let updateScheduled = false;
+
+    // Cache nav indices on load (static data)
+    const navIndices = [];
+    links.forEach(function(a) {
+        const href = a.getAttribute('href');
+        if (href && href.startsWith('#msg-')) {
+            navIndices.push(parseInt(href.replace('#msg-', ''), 10));
+        }
+    });
+    navIndices.sort(function(a, b) { return a - b; });
+
+    function updateActive() {
+        updateScheduled = false;
+        let currentIdx = -1;
+        let minDist = Infinity;
+        messages.forEach(function(m) {
+            const rect = m.getBoundingClientRect();
+            const dist = Math.abs(rect.top - headerOffset);
+            if (rect.top < window.innerHeight && rect.bottom > 0 && dist < minDist) {
+                minDist = dist;
+                currentIdx = parseInt(m.id.replace('msg-', ''), 10);
+            }
+        });
+        let activeIdx = -1;
+        for (let i = navIndices.length - 1; i >= 0; i--) {
+            if (navIndices[i] <= currentIdx) {
+                activeIdx = navIndices[i];
+                break;
+            }
+        }
+        if (currentIdx >= 0 && activeIdx < 0 && navIndices.length > 0) { activeIdx = navIndices[0]; }
+
+        // Only update if changed (reduces DOM updates)
+        if (activeIdx !== lastActiveIdx) {
+            lastActiveIdx = activeIdx;
+            links.forEach(function(a) {
+                a.classList.toggle('active', a.getAttribute('href') === '#msg-' + activeIdx);
+            });
+        }
+    }
+
+    // Throttle scroll updates to requestAnimationFrame
+    window.addEventListener('scroll', function() {
+        if (!updateScheduled) {
+            updateScheduled = true;
+            requestAnimationFrame(updateActive);
+        }
+    }, { passive: true });
+    window.addEventListener('load', updateActive);
+    updateActive();
+})();
+    </script>
+</body>
+</html>"""
+
+
+def _has_non_finite_float(obj: Any) -> bool:
+    """True if obj holds a NaN or infinite float anywhere inside its lists and dicts."""
+    if type(obj) is float:
+        return obj != obj or obj in (float("inf"), float("-inf"))
+    if isinstance(obj, dict):
+        return any(_has_non_finite_float(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_non_finite_float(value) for value in obj)
+    return False
+
+
+def _orjson_dumps_pretty(obj: Any) -> Optional[bytes]:
+    """orjson's 2-space indented encoding of obj, or None where only the stdlib encoder fits."""
+    if orjson is None:
+        return None
+    try:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    except TypeError:
+        # orjson rejects e.g. integers wider than 64 bits; the stdlib encoder copes
+        return None
+    # orjson writes NaN and Infinity as null; keep the stdlib's NaN/Infinity tokens instead
+    if b"null" in data and _has_non_finite_float(obj):
+        return None
+    return data
+
+
+def _json_dumps_pretty(obj: Any) -> str:
+    """Serialize obj as 2-space indented JSON, keeping non-ASCII characters.
+
+    With orjson installed, float exponents are written without sign padding
+    (1e100, 1e-7 rather than the stdlib's 1e+100, 1e-07); the values are the same.
+    """
+    data = _orjson_dumps_pretty(obj)
+    if data is not None:
+        return data.decode("utf-8")
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+def _json_dumps_pretty_bytes(obj: Any) -> bytes:
+    """UTF-8 encoded variant of _json_dumps_pretty, for writing straight to binary files."""
+    data = _orjson_dumps_pretty(obj)
+    if data is not None:
+        return data
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _split_timestamp(timestamp: str) -> Optional[Tuple[str, str]]:
+    """Split an ISO-8601 timestamp into ("YYYY-MM-DD", "HH:MM:SS"), or None if it does not parse."""
+    if not timestamp:
+        return None
+    if timestamp.endswith("Z"):
+        timestamp = timestamp[:-1] + "+00:00"
+    try:
+        # isoformat() is fixed-width, so slicing replaces two strftime calls
+        iso = datetime.fromisoformat(timestamp).isoformat()
+    except (TypeError, ValueError):
+        return None
+    return iso[:10], iso[11:19]
+
+
+def _iter_jsonl(root: str) -> Iterator[os.DirEntry]:
+    """Yield DirEntry objects for every .jsonl file below root.
+    
+    Walks with an explicit stack over os.scandir, so no Path object or fnmatch
+    call is made per directory entry. Symlinked directories are not followed and
+    unreadable directories are skipped.
+    """
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".jsonl"):
+                    yield entry
+
+
+def _render_markdown(text: str) -> str:
+    """Render markdown to sanitized HTML."""
+    # Imported on first use: together they are over half of this module's import time,
+    # and only HTML rendering needs them
+    import bleach
+    import markdown
+
+    html = markdown.markdown(
+        text,
+        extensions=["fenced_code", "tables", "nl2br", "sane_lists"],
+    )
+    return bleach.clean(
+        html,
+        tags={
+            "p", "br", "strong", "em", "b", "i", "u", "s",
+            "code", "pre", "ul", "ol", "li", "blockquote",
+            "h1", "h2", "h3", "h4", "h5", "h6",
+            "a", "hr", "table", "thead", "tbody", "tr", "th", "td",
+        },
+        attributes={"a": ["href", "title"]},
+        strip=True,
+    )
+
+
+# Rendering is a pure function of the text and by far the most expensive step of
+# the HTML export, while conversations repeat the same tool outputs, reminders and
+# file contents many times. Only texts up to _MARKDOWN_CACHE_MAX_CHARS are memoized
+# so a few huge tool outputs cannot pin large amounts of memory.
+_MARKDOWN_CACHE_MAX_CHARS = 64 * 1024
+_render_markdown_cached = lru_cache(maxsize=1024)(_render_markdown)
+
+
+def _count_remaining_lines(f: BinaryIO) -> int:
+    """Count the lines left in a binary file, reading in large chunks."""
+    count = 0
+    last_chunk = b"\n"
+    for chunk in iter(partial(f.read, _READ_BUFFER_SIZE), b""):
+        count += chunk.count(b"\n")
+        last_chunk = chunk
+    # A final line without a trailing newline still counts, as with line iteration
+    if not last_chunk.endswith(b"\n"):
+        count += 1
+    return count
 
 
 def setup_utf8_encoding():
@@ -54,6 +599,13 @@ def setup_utf8_encoding():
 setup_utf8_encoding()
 
 
+@lru_cache(maxsize=None)
+def _default_output_dir() -> Path:
+    """Resolve the default output directory once per process (created by the extractor)."""
+    # Use system temporary directory
+    return Path(tempfile.gettempdir()) / "claude-logs"
+
+
 class ClaudeConversationExtractor:
     """Extract and convert Claude Code conversations from JSONL to markdown."""
 
@@ -61,29 +613,42 @@ class ClaudeConversationExtractor:
         """Initialize the extractor with Claude's directory and output location."""
         self.claude_dir = Path.home() / ".claude" / "projects"
 
-        if output_dir:
-            self.output_dir = Path(output_dir)
-            self.output_dir.mkdir(parents=True, exist_ok=True)
-        else:
-            # Use system temporary directory
-            tmp_dir = Path(tempfile.gettempdir())
-            self.output_dir = tmp_dir / "claude-logs"
-            self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir = Path(output_dir) if output_dir else _default_output_dir()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
 
         print(f"📁 Saving logs to: {self.output_dir}")
 
-    def find_sessions(self, project_path: Optional[str] = None) -> List[Path]:
-        """Find all JSONL session files, sorted by most recent first."""
+    def find_sessions(
+        self, project_path: Optional[str] = None, *, sort: bool = True, limit: Optional[int] = None
+    ) -> List[Path]:
+        """Find all JSONL session files.
+        
+        Args:
+            project_path: Optional project directory (relative to the projects dir)
+            sort: If True (default), order by most recent first. Pass False when order
+                does not matter to skip the per-file stat() and the sort.
+            limit: With sort, return only the `limit` most recent sessions (selected
+                without sorting the whole list)
+        """
         if project_path:
             search_dir = self.claude_dir / project_path
         else:
             search_dir = self.claude_dir
 
-        sessions = []
-        if search_dir.exists():
-            for jsonl_file in search_dir.rglob("*.jsonl"):
-                sessions.append(jsonl_file)
-        return sorted(sessions, key=lambda x: x.stat().st_mtime, reverse=True)
+        if not search_dir.exists():
+            return []
+        if not sort:
+            return [Path(entry.path) for entry in _iter_jsonl(str(search_dir))]
+
+        sessions = (
+            (entry.stat().st_mtime, entry.path) for entry in _iter_jsonl(str(search_dir))
+        )
+        # Sort on the mtime captured during the scan - no second stat() per file
+        if limit is not None:
+            sessions = heapq.nlargest(limit, sessions, key=itemgetter(0))
+        else:
+            sessions = sorted(sessions, key=itemgetter(0), reverse=True)
+        return [Path(path) for _, path in sessions]
 
     def find_session_by_id(self, session_id: str) -> Optional[Path]:
         """Find a session file by session ID.
@@ -97,17 +662,25 @@ class ClaudeConversationExtractor:
         if not self.claude_dir.exists():
             return None
         
-        # Search for {session_id}.jsonl
-        matches = list(self.claude_dir.rglob(f"{session_id}.jsonl"))
-        return matches[0] if matches else None
+        # Search for {session_id}.jsonl, stopping at the first match
+        filename = f"{session_id}.jsonl"
+        for entry in _iter_jsonl(str(self.claude_dir)):
+            if entry.name == filename:
+                return Path(entry.path)
+        return None
 
     def _find_subagent_file(self, session_id: str, agent_id: str) -> Optional[Path]:
         """Find subagent JSONL in ~/.claude/projects/.../{session_id}/subagents/agent-{agent_id}.jsonl"""
         if not self.claude_dir.exists():
             return None
-        pattern = f"**/{session_id}/subagents/agent-{agent_id}.jsonl"
-        matches = list(self.claude_dir.rglob(pattern))
-        return matches[0] if matches else None
+        filename = f"agent-{agent_id}.jsonl"
+        for entry in _iter_jsonl(str(self.claude_dir)):
+            if entry.name == filename:
+                subagents_dir = os.path.dirname(entry.path)
+                if (os.path.basename(subagents_dir) == "subagents"
+                        and os.path.basename(os.path.dirname(subagents_dir)) == session_id):
+                    return Path(entry.path)
+        return None
 
     def extract_conversation(self, jsonl_path: Path, detailed: bool = False, _depth: int = 0) -> List[Dict[str, str]]:
         """Extract conversation messages from a JSONL file.
@@ -117,277 +690,249 @@ class ClaudeConversationExtractor:
             detailed: If True, include tool use, MCP responses, and system messages
             _depth: Recursion depth for subagent extraction (internal use)
         """
-        conversation = []
-        # Map tool_use_id to subagent_type for tracking subagent types
-        tool_use_to_subagent_type = {}
-        # Map tool_use_id to tool name for displaying tool results
-        tool_use_to_name = {}
+        return list(self.iter_conversation(jsonl_path, detailed=detailed, _depth=_depth))
+
+    def iter_conversation(
+        self, jsonl_path: Path, detailed: bool = False, _depth: int = 0
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield conversation messages from a JSONL file as they are parsed.
+        
+        Same arguments and messages as extract_conversation, without holding the
+        whole conversation in memory.
+        """
+        state = {
+            "jsonl_path": jsonl_path,
+            "detailed": detailed,
+            "depth": _depth,
+            # Map tool_use_id to subagent_type for tracking subagent types
+            "tool_use_to_subagent_type": {},
+            # Map tool_use_id to tool name for displaying tool results
+            "tool_use_to_name": {},
+        }
+        # Entry types without a handler (summaries, snapshots, ...) are skipped outright
+        handlers = self._DETAILED_ENTRY_HANDLERS if detailed else self._ENTRY_HANDLERS
+        # Per-line callables bound once as locals (no global/attribute lookups in the loop)
+        get_handler = handlers.get
+        gate = (_DETAILED_TYPE_RE if detailed else _MESSAGE_TYPE_RE).search
+        loads = _json_loads
 
         try:
-            with open(jsonl_path, "r", encoding="utf-8") as f:
+            # Read raw bytes: both orjson and json accept bytes and ignore surrounding whitespace
+            with open(jsonl_path, "rb", buffering=_READ_BUFFER_SIZE) as f:
                 for line in f:
+                    if gate(line) is None:
+                        continue
                     try:
-                        entry = json.loads(line.strip())
-
-                        # Extract user messages
-                        if entry.get("type") == "user" and "message" in entry:
-                            msg = entry["message"]
-                            if isinstance(msg, dict) and msg.get("role") == "user":
-                                content = msg.get("content", "")
-                                rich_content = self._extract_rich_content(content, detailed=detailed)
-                                # Fill tool_name in tool_result parts
-                                rich_content = self._fill_tool_names(rich_content, tool_use_to_name)
-                                
-                                # Insert subagent log before tool result (when agentId present)
-                                if _depth < 3:
-                                    tool_result_meta = entry.get("toolUseResult")
-                                    if isinstance(tool_result_meta, dict) and tool_result_meta.get("agentId"):
-                                        agent_id = tool_result_meta["agentId"]
-                                        session_id = entry.get("sessionId", jsonl_path.stem)
-                                        subagent_path = self._find_subagent_file(session_id, agent_id)
-                                        if subagent_path and subagent_path.exists():
-                                            tool_use_id = ""
-                                            if isinstance(content, list):
-                                                for item in content:
-                                                    if isinstance(item, dict) and item.get("type") == "tool_result":
-                                                        tool_use_id = item.get("tool_use_id", "")
-                                                        break
-                                            subagent_type = tool_use_to_subagent_type.get(tool_use_id, "")
-                                            subagent_msgs = self.extract_conversation(
-                                                subagent_path, detailed=detailed, _depth=_depth + 1
-                                            )
-                                            for m in subagent_msgs:
-                                                m.setdefault("metadata", {})
-                                                m["metadata"]["agent_id"] = agent_id
-                                                m["metadata"]["subagent_type"] = subagent_type
-                                                if not m["role"].startswith("subagent_"):
-                                                    m["role"] = f"subagent_{m['role']}"
-                                            conversation.extend(subagent_msgs)
-                                
-                                # Check if there's actual content
-                                if isinstance(rich_content, dict):
-                                    text = rich_content.get("text", "")
-                                else:
-                                    text = str(rich_content)
-                                
-                                if text and text.strip():
-                                    is_human = is_human_user_message(entry)
-                                    conversation.append(
-                                        {
-                                            "role": "user",
-                                            "content": rich_content,
-                                            "timestamp": entry.get("timestamp", ""),
-                                            "metadata": {"is_human": is_human},
-                                        }
-                                    )
-
-                        # Extract assistant messages
-                        elif entry.get("type") == "assistant" and "message" in entry:
-                            msg = entry["message"]
-                            if isinstance(msg, dict) and msg.get("role") == "assistant":
-                                content = msg.get("content", [])
-                                
-                                # Track tool uses to extract subagent_type and tool names
-                                subagent_start = False
-                                if isinstance(content, list):
-                                    for item in content:
-                                        if isinstance(item, dict) and item.get("type") == "tool_use":
-                                            tool_id = item.get("id", "")
-                                            tool_name = item.get("name", "")
-                                            # Map tool_use_id to tool name
-                                            if tool_id and tool_name:
-                                                tool_use_to_name[tool_id] = tool_name
-                                            # Track Task/Agent tool for subagent_type
-                                            if tool_name in ("Task", "Agent"):
-                                                subagent_start = True
-                                                tool_input = item.get("input", {})
-                                                subagent_type = tool_input.get("subagent_type", "")
-                                                if subagent_type:
-                                                    tool_use_to_subagent_type[tool_id] = subagent_type
-                                
-                                rich_content = self._extract_rich_content(content, detailed=detailed)
-                                # Fill tool_name in tool_result parts
-                                rich_content = self._fill_tool_names(rich_content, tool_use_to_name)
-                                
-                                # Check if there's actual content
-                                if isinstance(rich_content, dict):
-                                    text = rich_content.get("text", "")
-                                else:
-                                    text = str(rich_content)
-                                
-                                if text and text.strip():
-                                    conversation.append(
-                                        {
-                                            "role": "assistant",
-                                            "content": rich_content,
-                                            "timestamp": entry.get("timestamp", ""),
-                                            "usage": msg.get("usage", {}),
-                                            "model": msg.get("model"),
-                                            "metadata": {"subagent_start": subagent_start},
-                                        }
-                                    )
-                        
-                        # Extract progress entries (subagent output)
-                        elif entry.get("type") == "progress":
-                            data = entry.get("data", {})
-                            progress_type = data.get("type")
-                            
-                            if progress_type == "agent_progress":
-                                # Extract subagent messages
-                                message_data = data.get("message", {})
-                                if message_data:
-                                    msg_type = message_data.get("type")  # "user" or "assistant"
-                                    msg = message_data.get("message", {})
-                                    agent_id = data.get("agentId", "unknown")
-                                    parent_tool_use_id = entry.get("parentToolUseID", "")
-                                    
-                                    # Get subagent_type from the tool_use mapping
-                                    subagent_type = tool_use_to_subagent_type.get(parent_tool_use_id, "")
-                                    
-                                    if msg_type == "user" and msg.get("role") == "user":
-                                        content = msg.get("content", [])
-                                        
-                                        # Track tool_use in subagent messages
-                                        if isinstance(content, list):
-                                            for item in content:
-                                                if isinstance(item, dict) and item.get("type") == "tool_use":
-                                                    tool_id = item.get("id", "")
-                                                    tool_name = item.get("name", "")
-                                                    if tool_id and tool_name:
-                                                        tool_use_to_name[tool_id] = tool_name
-                                        
-                                        rich_content = self._extract_rich_content(content, detailed=detailed)
-                                        # Fill tool_name in tool_result parts
-                                        rich_content = self._fill_tool_names(rich_content, tool_use_to_name)
-                                        
-                                        if isinstance(rich_content, dict):
-                                            text = rich_content.get("text", "")
-                                        else:
-                                            text = str(rich_content)
-                                        
-                                        if text and text.strip():
-                                            conversation.append({
-                                                "role": "subagent_user",
-                                                "content": rich_content,
-                                                "metadata": {
-                                                    "agent_id": agent_id,
-                                                    "agent_type": "subagent",
-                                                    "subagent_type": subagent_type,
-                                                    "parent_tool_use_id": parent_tool_use_id
-                                                },
-                                                "timestamp": message_data.get("timestamp", entry.get("timestamp", ""))
-                                            })
-                                    elif msg_type == "assistant" and msg.get("role") == "assistant":
-                                        content = msg.get("content", [])
-                                        
-                                        # Track tool_use in subagent messages
-                                        if isinstance(content, list):
-                                            for item in content:
-                                                if isinstance(item, dict) and item.get("type") == "tool_use":
-                                                    tool_id = item.get("id", "")
-                                                    tool_name = item.get("name", "")
-                                                    if tool_id and tool_name:
-                                                        tool_use_to_name[tool_id] = tool_name
-                                        
-                                        rich_content = self._extract_rich_content(content, detailed=detailed)
-                                        # Fill tool_name in tool_result parts
-                                        rich_content = self._fill_tool_names(rich_content, tool_use_to_name)
-                                        
-                                        if isinstance(rich_content, dict):
-                                            text = rich_content.get("text", "")
-                                        else:
-                                            text = str(rich_content)
-                                        
-                                        if text and text.strip():
-                                            conversation.append({
-                                                "role": "subagent_assistant",
-                                                "content": rich_content,
-                                                "metadata": {
-                                                    "agent_id": agent_id,
-                                                    "agent_type": "subagent",
-                                                    "subagent_type": subagent_type,
-                                                    "parent_tool_use_id": parent_tool_use_id
-                                                },
-                                                "timestamp": message_data.get("timestamp", entry.get("timestamp", "")),
-                                                "usage": msg.get("usage", {}),
-                                                "model": msg.get("model"),
-                                            })
-                        
-                        # Include tool use and system messages if detailed mode
-                        elif detailed:
-                            # Extract tool use events
-                            if entry.get("type") == "tool_use":
-                                tool_data = entry.get("tool", {})
-                                tool_name = tool_data.get("name", "unknown")
-                                tool_input = tool_data.get("input", {})
-                                conversation.append(
-                                    {
-                                        "role": "tool_use",
-                                        "content": f"🔧 Tool: {tool_name}\nInput: {json.dumps(tool_input, indent=2)}",
-                                        "timestamp": entry.get("timestamp", ""),
-                                    }
-                                )
-                            
-                            # Extract tool results
-                            elif entry.get("type") == "tool_result":
-                                result = entry.get("result", {})
-                                output = result.get("output", "") or result.get("error", "")
-                                conversation.append(
-                                    {
-                                        "role": "tool_result",
-                                        "content": f"📤 Result:\n{output}",
-                                        "timestamp": entry.get("timestamp", ""),
-                                    }
-                                )
-                            
-                            # Extract system messages
-                            elif entry.get("type") == "system" and "message" in entry:
-                                msg = entry.get("message", "")
-                                if msg:
-                                    conversation.append(
-                                        {
-                                            "role": "system",
-                                            "content": f"ℹ️ System: {msg}",
-                                            "timestamp": entry.get("timestamp", ""),
-                                        }
-                                    )
+                        entry = loads(line)
+                        handler = get_handler(entry.get("type"))
+                        if handler is None:
+                            continue
+                        messages = handler(self, entry, state)
 
                     except json.JSONDecodeError:
                         continue
                     except Exception:
                         # Silently skip problematic entries
                         continue
+                    yield from messages
 
         except Exception as e:
             print(f"❌ Error reading file {jsonl_path}: {e}")
 
-        return conversation
+    def _emit_message(
+        self, role: str, content: Any, state: Dict[str, Any], **fields: Any
+    ) -> List[Dict[str, Any]]:
+        """Build a one-message list for ``role``, or [] when the content has no visible text.
+        
+        Extra keyword fields are added after role/content in the given order.
+        """
+        rich_content = self._extract_rich_content(
+            content, detailed=state["detailed"], tool_use_to_name=state["tool_use_to_name"]
+        )
+        if not self._has_text(rich_content):
+            return []
+        return [{"role": role, "content": rich_content, **fields}]
 
-    def _fill_tool_names(self, content: Union[str, Dict[str, Any]], tool_use_to_name: Dict[str, str]) -> Union[str, Dict[str, Any]]:
-        """Fill tool_name in tool_result parts using tool_use_id mapping.
+    def _parse_user_entry(self, entry: Dict[str, Any], state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Parse a ``user`` entry, inlining any subagent log that precedes its tool result."""
+        if "message" not in entry:
+            return []
+        msg = entry["message"]
+        if not (isinstance(msg, dict) and msg.get("role") == "user"):
+            return []
+
+        messages = []
+        detailed = state["detailed"]
+        content = msg.get("content", "")
         
-        Args:
-            content: Content dict or string
-            tool_use_to_name: Mapping from tool_use_id to tool name
+        # Insert subagent log before tool result (when agentId present)
+        if state["depth"] < 3:
+            tool_result_meta = entry.get("toolUseResult")
+            if isinstance(tool_result_meta, dict) and tool_result_meta.get("agentId"):
+                agent_id = tool_result_meta["agentId"]
+                session_id = entry.get("sessionId", state["jsonl_path"].stem)
+                subagent_path = self._find_subagent_file(session_id, agent_id)
+                if subagent_path and subagent_path.exists():
+                    tool_use_id = ""
+                    if isinstance(content, list):
+                        for item in content:
+                            if isinstance(item, dict) and item.get("type") == "tool_result":
+                                tool_use_id = item.get("tool_use_id", "")
+                                break
+                    subagent_type = state["tool_use_to_subagent_type"].get(tool_use_id, "")
+                    for m in self.iter_conversation(
+                        subagent_path, detailed=detailed, _depth=state["depth"] + 1
+                    ):
+                        m.setdefault("metadata", {})
+                        m["metadata"]["agent_id"] = agent_id
+                        m["metadata"]["subagent_type"] = subagent_type
+                        if not m["role"].startswith("subagent_"):
+                            m["role"] = f"subagent_{m['role']}"
+                        messages.append(m)
         
-        Returns:
-            Content with tool_name filled in tool_result parts
-        """
-        if isinstance(content, str) or not isinstance(content, dict):
-            return content
+        messages.extend(self._emit_message(
+            "user", content, state,
+            timestamp=entry.get("timestamp", ""),
+            metadata={"is_human": is_human_user_message(entry)},
+        ))
+        return messages
+
+    def _parse_assistant_entry(self, entry: Dict[str, Any], state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Parse an ``assistant`` entry, recording tool names and subagent launches."""
+        if "message" not in entry:
+            return []
+        msg = entry["message"]
+        if not (isinstance(msg, dict) and msg.get("role") == "assistant"):
+            return []
+
+        content = msg.get("content", [])
         
-        parts = content.get("parts", [])
-        if parts:
-            for part in parts:
-                if part.get("type") == "tool_result":
-                    tool_use_id = part.get("tool_use_id", "")
-                    if tool_use_id and not part.get("tool_name"):
-                        tool_name = tool_use_to_name.get(tool_use_id, "")
-                        if tool_name:
-                            part["tool_name"] = tool_name
+        # Track Task/Agent tool uses for subagent_type (tool names are recorded while
+        # the content parts are built)
+        subagent_start = False
+        if isinstance(content, list):
+            for item in content:
+                if (isinstance(item, dict) and item.get("type") == "tool_use"
+                        and item.get("name") in ("Task", "Agent")):
+                    subagent_start = True
+                    tool_input = item.get("input", {})
+                    subagent_type = tool_input.get("subagent_type", "")
+                    if subagent_type:
+                        if type(subagent_type) is str:
+                            subagent_type = sys.intern(subagent_type)
+                        state["tool_use_to_subagent_type"][item.get("id", "")] = subagent_type
         
-        return content
+        return self._emit_message(
+            "assistant", content, state,
+            timestamp=entry.get("timestamp", ""),
+            usage=msg.get("usage", {}),
+            model=msg.get("model"),
+            metadata={"subagent_start": subagent_start},
+        )
+
+    def _parse_progress_entry(self, entry: Dict[str, Any], state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Parse a ``progress`` entry carrying subagent output."""
+        data = entry.get("data", {})
+        progress_type = data.get("type")
+        if progress_type != "agent_progress":
+            return []
+
+        # Extract subagent messages
+        message_data = data.get("message", {})
+        if not message_data:
+            return []
+
+        msg_type = message_data.get("type")  # "user" or "assistant"
+        msg = message_data.get("message", {})
+        agent_id = data.get("agentId", "unknown")
+        parent_tool_use_id = entry.get("parentToolUseID", "")
+        
+        # Get subagent_type from the tool_use mapping
+        subagent_type = state["tool_use_to_subagent_type"].get(parent_tool_use_id, "")
+        
+        if msg_type not in ("user", "assistant") or msg.get("role") != msg_type:
+            return []
+
+        content = msg.get("content", [])
+        metadata = {
+            "agent_id": agent_id,
+            "agent_type": "subagent",
+            "subagent_type": subagent_type,
+            "parent_tool_use_id": parent_tool_use_id
+        }
+        timestamp = message_data.get("timestamp", entry.get("timestamp", ""))
+        if msg_type == "user":
+            return self._emit_message(
+                "subagent_user", content, state, metadata=metadata, timestamp=timestamp
+            )
+        return self._emit_message(
+            "subagent_assistant", content, state,
+            metadata=metadata, timestamp=timestamp,
+            usage=msg.get("usage", {}), model=msg.get("model"),
+        )
+
+    def _parse_tool_use_entry(self, entry: Dict[str, Any], state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Parse a standalone ``tool_use`` event (detailed mode only)."""
+        tool_data = entry.get("tool", {})
+        tool_name = tool_data.get("name", "unknown")
+        tool_input = tool_data.get("input", {})
+        return [
+            {
+                "role": "tool_use",
+                "content": f"🔧 Tool: {tool_name}\nInput: {json.dumps(tool_input, indent=2)}",
+                "timestamp": entry.get("timestamp", ""),
+            }
+        ]
+
+    def _parse_tool_result_entry(self, entry: Dict[str, Any], state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Parse a standalone ``tool_result`` event (detailed mode only)."""
+        result = entry.get("result", {})
+        output = result.get("output", "") or result.get("error", "")
+        return [
+            {
+                "role": "tool_result",
+                "content": f"📤 Result:\n{output}",
+                "timestamp": entry.get("timestamp", ""),
+            }
+        ]
 
+    def _parse_system_entry(self, entry: Dict[str, Any], state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Parse a ``system`` entry (detailed mode only)."""
+        msg = entry.get("message", "")
+        if "message" not in entry or not msg:
+            return []
+        return [
+            {
+                "role": "system",
+                "content": f"ℹ️ System: {msg}",
+                "timestamp": entry.get("timestamp", ""),
+            }
+        ]
+
+    # Entry "type" -> parser. Detailed mode additionally keeps tool and system events.
+    _ENTRY_HANDLERS = {
+        "user": _parse_user_entry,
+        "assistant": _parse_assistant_entry,
+        "progress": _parse_progress_entry,
+    }
+    _DETAILED_ENTRY_HANDLERS = {
+        **_ENTRY_HANDLERS,
+        "tool_use": _parse_tool_use_entry,
+        "tool_result": _parse_tool_result_entry,
+        "system": _parse_system_entry,
+    }
+
+    @staticmethod
+    def _has_text(rich_content: Union[str, Dict[str, Any]]) -> bool:
+        """Return True if extracted content has any non-whitespace text.
+        
+        Uses str.isspace() rather than strip() so large messages are not copied.
+        """
+        if isinstance(rich_content, dict):
+            text = rich_content.get("text", "")
+        else:
+            text = str(rich_content)
+        return bool(text) and not text.isspace()
 
     def _sum_usage(self, conversation: List[Dict]) -> Dict[str, int]:
         """Sum token usage across all messages. input = input_tokens + cache_read_input_tokens."""
@@ -410,8 +955,8 @@ class ClaudeConversationExtractor:
         if not text or not text.strip():
             return text
         try:
-            parsed = json.loads(text)
-            formatted = json.dumps(parsed, indent=2, ensure_ascii=False)
+            parsed = _json_loads(text)
+            formatted = _json_dumps_pretty(parsed)
             return f"```json\n{formatted}\n```"
         except (json.JSONDecodeError, TypeError, ValueError):
             return text
@@ -467,12 +1012,20 @@ class ClaudeConversationExtractor:
             return rich_content.get("text", "")
         return str(rich_content)
     
-    def _extract_rich_content(self, content, detailed: bool = False) -> Union[str, Dict[str, Any]]:
+    def _extract_rich_content(
+        self, content, detailed: bool = False, tool_use_to_name: Optional[Dict[str, str]] = None,
+        want_text: bool = True
+    ) -> Union[str, Dict[str, Any]]:
         """Extract structured content from various formats Claude uses.
         
         Args:
             content: The content to extract from (string, list, or dict)
             detailed: If True, include tool use blocks and other metadata
+            tool_use_to_name: Optional tool_use_id -> tool name mapping. tool_use blocks
+                are recorded into it and tool_result parts get their tool_name from it,
+                in a single pass over the content
+            want_text: If False, skip building the combined plain-text field for
+                multi-part content (callers that only read "parts")
         
         Returns:
             Either a string (for simple text) or a dict with structure:
@@ -496,73 +1049,12 @@ class ClaudeConversationExtractor:
             }
         elif isinstance(content, list):
             parts = []
+            handlers = self._PART_HANDLERS
             for item in content:
                 if isinstance(item, dict):
-                    item_type = item.get("type")
-                    if item_type == "text":
-                        parts.append({
-                            "type": "text",
-                            "text": item.get("text", "")
-                        })
-                    elif item_type == "thinking":
-                        parts.append({
-                            "type": "thinking",
-                            "thinking": item.get("thinking", "")
-                        })
-                    elif item_type == "tool_use":
-                        if detailed:
-                            parts.append({
-                                "type": "tool_use",
-                                "name": item.get("name", "unknown"),
-                                "input": item.get("input", {})
-                            })
-                    elif item_type == "image":
-                        source = item.get("source", {})
-                        image_data = {
-                            "type": "image",
-                            "source_type": source.get("type", "unknown")
-                        }
-                        
-                        # Process base64 data
-                        if "data" in source:
-                            image_data["source"] = source  # Save full source for HTML rendering
-                            image_data["has_full_data"] = True
-                        
-                        # Process dataUrl
-                        if "dataUrl" in source:
-                            image_data["data_url"] = source["dataUrl"]
-                        
-                        parts.append(image_data)
-                    elif item_type == "tool_reference":
-                        parts.append({
-                            "type": "tool_reference",
-                            "tool_name": item.get("tool_name", "unknown")
-                        })
-                    elif item_type == "tool_result":
-                        # Recursively extract content from tool_result
-                        tool_result_content = item.get("content", [])
-                        tool_result_extracted = self._extract_rich_content(tool_result_content, detailed=detailed)
-                        tool_use_id = item.get("tool_use_id", "")
-                        
-                        if isinstance(tool_result_extracted, dict):
-                            # Extract parts from the tool_result content
-                            tool_result_inner_parts = tool_result_extracted.get("parts", [])
-                            # Add tool_result wrapper for each inner part
-                            for inner_part in tool_result_inner_parts:
-                                parts.append({
-                                    "type": "tool_result",
-                                    "tool_use_id": tool_use_id,
-                                    "tool_name": None,  # Will be filled later if mapping available
-                                    "content": inner_part
-                                })
-                        else:
-                            # Fallback: treat as text
-                            parts.append({
-                                "type": "tool_result",
-                                "tool_use_id": tool_use_id,
-                                "tool_name": None,  # Will be filled later if mapping available
-                                "content": {"type": "text", "text": str(tool_result_extracted)}
-                            })
+                    handler = handlers.get(item.get("type"))
+                    if handler is not None:
+                        handler(self, item, parts, detailed, tool_use_to_name)
             
             # If only one text part, return simplified format for backward compatibility
             if len(parts) == 1 and parts[0]["type"] == "text":
@@ -578,21 +1070,26 @@ class ClaudeConversationExtractor:
                     "parts": []
                 }
             else:
+                if not want_text:
+                    return {"type": "rich", "text": "", "parts": parts}
+
                 # Build combined text for backward compatibility
                 text_parts = []
+                add = text_parts.append
                 for part in parts:
-                    if part["type"] == "text":
-                        text_parts.append(part["text"])
-                    elif part["type"] == "thinking":
-                        text_parts.append(f"\n[Thinking] {part['thinking']}\n")
-                    elif part["type"] == "tool_use":
-                        text_parts.append(f"\n🔧 Using tool: {part['name']}\n")
-                        text_parts.append(f"Input: {json.dumps(part['input'], indent=2, ensure_ascii=False)}\n")
-                    elif part["type"] == "image":
-                        text_parts.append("\n[Image]\n")
-                    elif part["type"] == "tool_reference":
-                        text_parts.append(f"\n[Tool Reference] {part['tool_name']}\n")
-                    elif part["type"] == "tool_result":
+                    part_type = part["type"]
+                    if part_type == "text":
+                        add(part["text"])
+                    elif part_type == "thinking":
+                        add(f"\n[Thinking] {part['thinking']}\n")
+                    elif part_type == "tool_use":
+                        add(f"\n🔧 Using tool: {part['name']}\n")
+                        add(f"Input: {json.dumps(part['input'], ensure_ascii=False, separators=(',', ':'))}\n")
+                    elif part_type == "image":
+                        add("\n[Image]\n")
+                    elif part_type == "tool_reference":
+                        add(f"\n[Tool Reference] {part['tool_name']}\n")
+                    elif part_type == "tool_result":
                         tool_use_id = part.get("tool_use_id", "")
                         tool_name = part.get("tool_name", "")
                         tool_display = tool_name if tool_name else f"{tool_use_id[:8]}..."
@@ -601,13 +1098,13 @@ class ClaudeConversationExtractor:
                             if content_part.get("type") == "text":
                                 raw = content_part.get('text', '')
                                 formatted = self._format_json_if_valid(raw)
-                                text_parts.append(f"\n[Tool Result: {tool_display}]\n{formatted}\n")
+                                add(f"\n[Tool Result: {tool_display}]\n{formatted}\n")
                             elif content_part.get("type") == "image":
-                                text_parts.append(f"\n[Tool Result: {tool_display}]\n[Image]\n")
+                                add(f"\n[Tool Result: {tool_display}]\n[Image]\n")
                             else:
-                                text_parts.append(f"\n[Tool Result: {tool_display}]\n")
+                                add(f"\n[Tool Result: {tool_display}]\n")
                         else:
-                            text_parts.append(f"\n[Tool Result: {tool_display}]\n{str(content_part)}\n")
+                            add(f"\n[Tool Result: {tool_display}]\n{str(content_part)}\n")
                 
                 return {
                     "type": "rich",
@@ -615,30 +1112,188 @@ class ClaudeConversationExtractor:
                     "parts": parts
                 }
         else:
-            return {
-                "type": "text",
-                "text": str(content),
-                "parts": [{"type": "text", "text": str(content)}]
-            }
+            return {
+                "type": "text",
+                "text": str(content),
+                "parts": [{"type": "text", "text": str(content)}]
+            }
+
+    def _add_text_part(
+        self, item: Dict[str, Any], parts: List[Dict[str, Any]],
+        detailed: bool, tool_use_to_name: Optional[Dict[str, str]]
+    ) -> None:
+        """Append a plain text part."""
+        parts.append({
+            "type": "text",
+            "text": item.get("text", "")
+        })
+
+    def _add_thinking_part(
+        self, item: Dict[str, Any], parts: List[Dict[str, Any]],
+        detailed: bool, tool_use_to_name: Optional[Dict[str, str]]
+    ) -> None:
+        """Append an extended-thinking part."""
+        parts.append({
+            "type": "thinking",
+            "thinking": item.get("thinking", "")
+        })
+
+    def _add_tool_use_part(
+        self, item: Dict[str, Any], parts: List[Dict[str, Any]],
+        detailed: bool, tool_use_to_name: Optional[Dict[str, str]]
+    ) -> None:
+        """Record the tool name for later tool_results; append a tool_use part (detailed only)."""
+        tool_id = item.get("id", "")
+        tool_name = item.get("name", "")
+        # Names repeat across thousands of calls; interning keeps one copy per name
+        # (only str can be interned; other JSON values are stored as they are)
+        if tool_use_to_name is not None and tool_id and tool_name:
+            tool_use_to_name[tool_id] = (
+                sys.intern(tool_name) if type(tool_name) is str else tool_name
+            )
+        if detailed:
+            parts.append({
+                "type": "tool_use",
+                "name": item.get("name", "unknown"),
+                "input": item.get("input", {})
+            })
+
+    def _add_image_part(
+        self, item: Dict[str, Any], parts: List[Dict[str, Any]],
+        detailed: bool, tool_use_to_name: Optional[Dict[str, str]]
+    ) -> None:
+        """Append an image part, keeping base64 data or dataUrl for HTML rendering."""
+        source = item.get("source", {})
+        image_data = {
+            "type": "image",
+            "source_type": source.get("type", "unknown")
+        }
+        
+        # Process base64 data
+        if "data" in source:
+            image_data["source"] = source  # Save full source for HTML rendering
+            image_data["has_full_data"] = True
+        
+        # Process dataUrl
+        if "dataUrl" in source:
+            image_data["data_url"] = source["dataUrl"]
+        
+        parts.append(image_data)
+
+    def _add_tool_reference_part(
+        self, item: Dict[str, Any], parts: List[Dict[str, Any]],
+        detailed: bool, tool_use_to_name: Optional[Dict[str, str]]
+    ) -> None:
+        """Append a tool_reference part."""
+        parts.append({
+            "type": "tool_reference",
+            "tool_name": item.get("tool_name", "unknown")
+        })
+
+    def _add_tool_result_part(
+        self, item: Dict[str, Any], parts: List[Dict[str, Any]],
+        detailed: bool, tool_use_to_name: Optional[Dict[str, str]]
+    ) -> None:
+        """Append one tool_result part per inner part of the tool result content."""
+        # Recursively extract content from tool_result
+        tool_result_content = item.get("content", [])
+        tool_result_extracted = self._extract_rich_content(
+            tool_result_content, detailed=detailed, want_text=False
+        )
+        tool_use_id = item.get("tool_use_id", "")
+        tool_name = (tool_use_to_name.get(tool_use_id) or None) if tool_use_to_name else None
+        
+        if isinstance(tool_result_extracted, dict):
+            # Extract parts from the tool_result content
+            tool_result_inner_parts = tool_result_extracted.get("parts", [])
+            # Add tool_result wrapper for each inner part
+            for inner_part in tool_result_inner_parts:
+                parts.append({
+                    "type": "tool_result",
+                    "tool_use_id": tool_use_id,
+                    "tool_name": tool_name,
+                    "content": inner_part
+                })
+        else:
+            # Fallback: treat as text
+            parts.append({
+                "type": "tool_result",
+                "tool_use_id": tool_use_id,
+                "tool_name": tool_name,
+                "content": {"type": "text", "text": str(tool_result_extracted)}
+            })
+
+    # Content item "type" -> part builder used by _extract_rich_content
+    _PART_HANDLERS = {
+        "text": _add_text_part,
+        "thinking": _add_thinking_part,
+        "tool_use": _add_tool_use_part,
+        "image": _add_image_part,
+        "tool_reference": _add_tool_reference_part,
+        "tool_result": _add_tool_result_part,
+    }
 
     def _markdown_to_html(self, text: str) -> str:
         """Convert markdown to HTML with sanitization (safe for embedding)."""
         if not text or not text.strip():
             return ""
-        html = markdown.markdown(
-            text,
-            extensions=["fenced_code", "tables", "nl2br", "sane_lists"],
+        if len(text) <= _MARKDOWN_CACHE_MAX_CHARS:
+            return _render_markdown_cached(text)
+        return _render_markdown(text)
+
+    # Per-part renderers, dispatched on part["type"]; unknown part types render nothing
+    def _html_text_part(self, part: Dict[str, Any]) -> str:
+        return f'<div class="content-text markdown-body">{self._markdown_to_html(part["text"])}</div>'
+
+    def _html_thinking_part(self, part: Dict[str, Any]) -> str:
+        return (
+            f'<div class="content-thinking">'
+            f'<div class="thinking-header">Thinking Process</div>'
+            f'<div class="thinking-content markdown-body">{self._markdown_to_html(part["thinking"])}</div>'
+            f'</div>'
+        )
+
+    def _html_tool_use_part(self, part: Dict[str, Any]) -> str:
+        tool_input_json = _json_dumps_pretty(part["input"])
+        return (
+            f'<div class="content-tool-use">'
+            f'<div class="tool-name">🔧 {escape_html(part["name"])}</div>'
+            f'<pre class="tool-input">{escape_html(tool_input_json)}</pre>'
+            f'</div>'
+        )
+
+    def _html_tool_reference_part(self, part: Dict[str, Any]) -> str:
+        return (
+            f'<div class="content-tool-reference">'
+            f'<span class="tool-ref-label">Tool Reference:</span> '
+            f'<code>{escape_html(part["tool_name"])}</code>'
+            f'</div>'
         )
-        return bleach.clean(
-            html,
-            tags={
-                "p", "br", "strong", "em", "b", "i", "u", "s",
-                "code", "pre", "ul", "ol", "li", "blockquote",
-                "h1", "h2", "h3", "h4", "h5", "h6",
-                "a", "hr", "table", "thead", "tbody", "tr", "th", "td",
-            },
-            attributes={"a": ["href", "title"]},
-            strip=True,
+
+    def _html_tool_result_part(self, part: Dict[str, Any]) -> str:
+        tool_use_id = part.get("tool_use_id", "")
+        tool_name = part.get("tool_name", "")
+        tool_display = tool_name if tool_name else f"{tool_use_id[:8]}..."
+        content_part = part.get("content", {})
+        
+        if isinstance(content_part, dict):
+            content_type = content_part.get("type")
+            if content_type == "text":
+                raw_text = content_part.get("text", "")
+                formatted = self._format_json_if_valid(raw_text)
+                body = f'<div class="tool-result-content markdown-body">{self._markdown_to_html(formatted)}</div>'
+            elif content_type == "image":
+                body = self._render_image_html(content_part)
+            else:
+                body = f'<div class="tool-result-content">{escape_html(str(content_part))}</div>'
+        else:
+            body = f'<div class="tool-result-content">{escape_html(str(content_part))}</div>'
+        
+        return (
+            '<div class="content-tool-result">\n'
+            f'<div class="tool-result-header">📤 Tool Result: {escape_html(tool_display)}</div>\n'
+            f'{body}\n'
+            '</div>'
         )
 
     def _render_content_to_html(self, content: Union[str, Dict[str, Any]]) -> str:
@@ -650,98 +1305,91 @@ class ClaudeConversationExtractor:
         Returns:
             HTML formatted string
         """
-        if isinstance(content, str):
+        # Exact type check: only plain str is treated as legacy content
+        if type(content) is str:
             # Backward compatible: plain text content
             return escape_html(content)
         
         # Structured content
-        parts = content.get("parts", [])
+        get_renderer = self._HTML_PART_RENDERERS.get
         html_parts = []
+        add = html_parts.append
         
-        for part in parts:
-            part_type = part.get("type")
-            if part_type == "text":
-                html_parts.append(f'<div class="content-text markdown-body">{self._markdown_to_html(part["text"])}</div>')
-            elif part_type == "thinking":
-                html_parts.append(
-                    f'<div class="content-thinking">'
-                    f'<div class="thinking-header">Thinking Process</div>'
-                    f'<div class="thinking-content markdown-body">{self._markdown_to_html(part["thinking"])}</div>'
-                    f'</div>'
-                )
-            elif part_type == "tool_use":
-                tool_input_json = json.dumps(part["input"], indent=2, ensure_ascii=False)
-                html_parts.append(
-                    f'<div class="content-tool-use">'
-                    f'<div class="tool-name">🔧 {escape_html(part["name"])}</div>'
-                    f'<pre class="tool-input">{escape_html(tool_input_json)}</pre>'
-                    f'</div>'
-                )
-            elif part_type == "image":
-                source = part.get("source", {})
-                if "data" in source and part.get("has_full_data"):
-                    # Display base64 image
-                    data_url = f"data:image/jpeg;base64,{source['data']}"
-                    html_parts.append(
-                        f'<div class="content-image">'
-                        f'<img src="{data_url}" alt="Screenshot" style="max-width: 100%; height: auto;" />'
-                        f'</div>'
-                    )
-                elif part.get("data_url"):
-                    html_parts.append(
-                        f'<div class="content-image">'
-                        f'<img src="{escape_html(part["data_url"])}" alt="Screenshot" style="max-width: 100%; height: auto;" />'
-                        f'</div>'
-                    )
-                else:
-                    html_parts.append('<div class="content-image-placeholder">[Image Data]</div>')
-            elif part_type == "tool_reference":
-                html_parts.append(
-                    f'<div class="content-tool-reference">'
-                    f'<span class="tool-ref-label">Tool Reference:</span> '
-                    f'<code>{escape_html(part["tool_name"])}</code>'
-                    f'</div>'
-                )
-            elif part_type == "tool_result":
-                tool_use_id = part.get("tool_use_id", "")
-                tool_name = part.get("tool_name", "")
-                tool_display = tool_name if tool_name else f"{tool_use_id[:8]}..."
-                content_part = part.get("content", {})
-                
-                html_parts.append(f'<div class="content-tool-result">')
-                html_parts.append(f'<div class="tool-result-header">📤 Tool Result: {escape_html(tool_display)}</div>')
-                
-                if isinstance(content_part, dict):
-                    content_type = content_part.get("type")
-                    if content_type == "text":
-                        raw_text = content_part.get("text", "")
-                        formatted = self._format_json_if_valid(raw_text)
-                        html_parts.append(f'<div class="tool-result-content markdown-body">{self._markdown_to_html(formatted)}</div>')
-                    elif content_type == "image":
-                        source = content_part.get("source", {})
-                        if "data" in source and content_part.get("has_full_data"):
-                            data_url = f"data:image/jpeg;base64,{source['data']}"
-                            html_parts.append(
-                                f'<div class="content-image">'
-                                f'<img src="{data_url}" alt="Screenshot" style="max-width: 100%; height: auto;" />'
-                                f'</div>'
-                            )
-                        elif content_part.get("data_url"):
-                            html_parts.append(
-                                f'<div class="content-image">'
-                                f'<img src="{escape_html(content_part["data_url"])}" alt="Screenshot" style="max-width: 100%; height: auto;" />'
-                                f'</div>'
-                            )
-                        else:
-                            html_parts.append('<div class="content-image-placeholder">[Image Data]</div>')
-                    else:
-                        html_parts.append(f'<div class="tool-result-content">{escape_html(str(content_part))}</div>')
-                else:
-                    html_parts.append(f'<div class="tool-result-content">{escape_html(str(content_part))}</div>')
-                
-                html_parts.append(f'</div>')
+        for part in content.get("parts", []):
+            renderer = get_renderer(part.get("type"))
+            if renderer is not None:
+                add(renderer(self, part))
         
         return "\n".join(html_parts) if html_parts else self._markdown_to_html(content.get("text", ""))
+
+    def _render_image_html(self, part: Dict[str, Any]) -> str:
+        """Render an image part (or image tool result) as an <img> block or placeholder."""
+        source = part.get("source", {})
+        if "data" in source and part.get("has_full_data"):
+            # Display base64 image; valid base64 is emitted as-is (no escape copy)
+            data = source["data"]
+            if not _BASE64_RE.fullmatch(data):
+                data = escape_html(data)
+            return "".join((_BASE64_DATA_URL_PREFIX, data, _IMAGE_HTML_SUFFIX))
+        data_url = part.get("data_url")
+        if data_url:
+            if not _BASE64_DATA_URL_RE.fullmatch(data_url):
+                data_url = escape_html(data_url)
+            return "".join((_IMAGE_HTML_PREFIX, data_url, _IMAGE_HTML_SUFFIX))
+        return _IMAGE_PLACEHOLDER_HTML
+    
+    def _markdown_text_part(self, part: Dict[str, Any]) -> str:
+        return part["text"]
+
+    def _markdown_thinking_part(self, part: Dict[str, Any]) -> str:
+        return f"\n**Thinking Process:**\n\n```\n{part['thinking']}\n```\n"
+
+    def _markdown_tool_use_part(self, part: Dict[str, Any]) -> str:
+        return f"\n**🔧 Using Tool:** `{part['name']}`\n\n```json\n{_json_dumps_pretty(part['input'])}\n```\n"
+
+    def _markdown_image_part(self, part: Dict[str, Any]) -> str:
+        return "\n**📷 Image**\n\n*[Image data included in conversation]*\n"
+
+    def _markdown_tool_reference_part(self, part: Dict[str, Any]) -> str:
+        return f"\n**Tool Reference:** `{part['tool_name']}`\n"
+
+    def _markdown_tool_result_part(self, part: Dict[str, Any]) -> str:
+        tool_use_id = part.get("tool_use_id", "")
+        tool_name = part.get("tool_name", "")
+        tool_display = tool_name if tool_name else f"{tool_use_id[:8]}..."
+        content_part = part.get("content", {})
+        
+        if isinstance(content_part, dict):
+            content_type = content_part.get("type")
+            if content_type == "text":
+                raw = content_part.get('text', '')
+                body = self._format_json_if_valid(raw)
+            elif content_type == "image":
+                body = "*[Image data included in conversation]*"
+            else:
+                body = str(content_part)
+        else:
+            body = str(content_part)
+        
+        return f"\n**📤 Tool Result: {tool_display}**\n\n\n{body}\n"
+
+    _HTML_PART_RENDERERS = {
+        "text": _html_text_part,
+        "thinking": _html_thinking_part,
+        "tool_use": _html_tool_use_part,
+        "image": _render_image_html,
+        "tool_reference": _html_tool_reference_part,
+        "tool_result": _html_tool_result_part,
+    }
+
+    _MARKDOWN_PART_RENDERERS = {
+        "text": _markdown_text_part,
+        "thinking": _markdown_thinking_part,
+        "tool_use": _markdown_tool_use_part,
+        "image": _markdown_image_part,
+        "tool_reference": _markdown_tool_reference_part,
+        "tool_result": _markdown_tool_result_part,
+    }
     
     def _render_content_to_markdown(self, content: Union[str, Dict[str, Any]]) -> str:
         """Render content to Markdown format.
@@ -752,88 +1400,69 @@ class ClaudeConversationExtractor:
         Returns:
             Markdown formatted string
         """
-        if isinstance(content, str):
+        # Exact type check: only plain str is treated as legacy content
+        if type(content) is str:
             return content
         
         # Structured content
-        parts = content.get("parts", [])
-        markdown_parts = []
-        
-        for part in parts:
-            part_type = part.get("type")
-            if part_type == "text":
-                markdown_parts.append(part["text"])
-            elif part_type == "thinking":
-                markdown_parts.append(f"\n**Thinking Process:**\n\n```\n{part['thinking']}\n```\n")
-            elif part_type == "tool_use":
-                markdown_parts.append(f"\n**🔧 Using Tool:** `{part['name']}`\n\n```json\n{json.dumps(part['input'], indent=2, ensure_ascii=False)}\n```\n")
-            elif part_type == "image":
-                markdown_parts.append("\n**📷 Image**\n\n*[Image data included in conversation]*\n")
-            elif part_type == "tool_reference":
-                markdown_parts.append(f"\n**Tool Reference:** `{part['tool_name']}`\n")
-            elif part_type == "tool_result":
-                tool_use_id = part.get("tool_use_id", "")
-                tool_name = part.get("tool_name", "")
-                tool_display = tool_name if tool_name else f"{tool_use_id[:8]}..."
-                content_part = part.get("content", {})
-                markdown_parts.append(f"\n**📤 Tool Result: {tool_display}**\n\n")
-                
-                if isinstance(content_part, dict):
-                    content_type = content_part.get("type")
-                    if content_type == "text":
-                        raw = content_part.get('text', '')
-                        formatted = self._format_json_if_valid(raw)
-                        markdown_parts.append(f"{formatted}\n")
-                    elif content_type == "image":
-                        markdown_parts.append("*[Image data included in conversation]*\n")
-                    else:
-                        markdown_parts.append(f"{str(content_part)}\n")
-                else:
-                    markdown_parts.append(f"{str(content_part)}\n")
+        get_renderer = self._MARKDOWN_PART_RENDERERS.get
+        markdown_parts = [
+            renderer(self, part)
+            for part in content.get("parts", [])
+            if (renderer := get_renderer(part.get("type"))) is not None
+        ]
         
         return "\n".join(markdown_parts) if markdown_parts else content.get("text", "")
     
-    def display_conversation(self, jsonl_path: Path, detailed: bool = False) -> None:
+    def display_conversation(
+        self,
+        jsonl_path: Path,
+        detailed: bool = False,
+        conversation: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
         """Display a conversation in the terminal with pagination.
         
         Args:
             jsonl_path: Path to the JSONL file
             detailed: If True, include tool use and system messages
+            conversation: Already extracted messages for jsonl_path, if the
+                caller has them; the file is not parsed again
         """
         try:
-            # Extract conversation
-            messages = self.extract_conversation(jsonl_path, detailed=detailed)
+            # Stream the conversation; only the first message is needed up front
+            if conversation is not None:
+                messages = iter(conversation)
+            else:
+                messages = self.iter_conversation(jsonl_path, detailed=detailed)
+            first_message = next(messages, None)
             
-            if not messages:
+            if first_message is None:
                 print("❌ No messages found in conversation")
                 return
             
             # Get session info
             session_id = jsonl_path.stem
             
+            # Output is buffered and written once per page (before each prompt)
+            out = []
+            add = out.append
+            
             # Clear screen and show header
-            print("\033[2J\033[H", end="")  # Clear screen
-            print("=" * 60)
-            print(f"📄 Viewing: {jsonl_path.parent.name}")
-            print(f"Session: {session_id[:8]}...")
+            add(_CLEAR_SCREEN)
+            add(f"{'=' * 60}\n📄 Viewing: {jsonl_path.parent.name}\nSession: {session_id[:8]}...\n")
             
             # Get timestamp from first message
-            first_timestamp = messages[0].get("timestamp", "")
-            if first_timestamp:
-                try:
-                    dt = datetime.fromisoformat(first_timestamp.replace("Z", "+00:00"))
-                    print(f"Date: {dt.strftime('%Y-%m-%d %H:%M:%S')}")
-                except Exception:
-                    pass
+            parsed = _split_timestamp(first_message.get("timestamp", ""))
+            if parsed:
+                add(f"Date: {parsed[0]} {parsed[1]}\n")
             
-            print("=" * 60)
-            print("↑↓ to scroll • Q to quit • Enter to continue\n")
+            add(f"{'=' * 60}\n↑↓ to scroll • Q to quit • Enter to continue\n\n")
             
             # Display messages with pagination
             lines_shown = 8  # Header lines
             lines_per_page = 30
             
-            for i, msg in enumerate(messages):
+            for msg in chain((first_message,), messages):
                 role = msg["role"]
                 content = msg["content"]
                 
@@ -844,73 +1473,66 @@ class ClaudeConversationExtractor:
                     display_content = str(content)
                 
                 # Format role display
-                if role == "user" or role == "human":
-                    print(f"\n{'─' * 40}")
-                    print(f"👤 HUMAN:")
-                    print(f"{'─' * 40}")
-                elif role == "assistant":
-                    print(f"\n{'─' * 40}")
-                    print(f"🤖 CLAUDE:")
-                    print(f"{'─' * 40}")
-                elif role == "subagent_user":
-                    metadata = msg.get("metadata", {})
-                    agent_id = metadata.get("agent_id", "unknown")
-                    subagent_type = metadata.get("subagent_type", "")
-                    subagent_display = f"{subagent_type.upper()}" if subagent_type else f"{agent_id[:8]}..."
-                    print(f"\n{'─' * 40}")
-                    print(f"🤖 SUBAGENT ({subagent_display}) USER:")
-                    print(f"{'─' * 40}")
-                elif role == "subagent_assistant":
-                    metadata = msg.get("metadata", {})
-                    agent_id = metadata.get("agent_id", "unknown")
-                    subagent_type = metadata.get("subagent_type", "")
-                    subagent_display = f"{subagent_type.upper()}" if subagent_type else f"{agent_id[:8]}..."
-                    print(f"\n{'─' * 40}")
-                    print(f"🤖 SUBAGENT ({subagent_display}) ASSISTANT:")
-                    print(f"{'─' * 40}")
-                elif role == "tool_use":
-                    print(f"\n🔧 TOOL USE:")
-                elif role == "tool_result":
-                    print(f"\n📤 TOOL RESULT:")
-                elif role == "system":
-                    print(f"\nℹ️ SYSTEM:")
-                else:
-                    print(f"\n{role.upper()}:")
+                header = _TERMINAL_ROLE_HEADERS.get(role)
+                if header is None:
+                    header = f"\n{role.upper()}:"
+                elif role.startswith("subagent_"):
+                    header = header.format(
+                        subagent=format_subagent_display(msg.get("metadata", {}))
+                    )
+                add(header + "\n")
                 
-                # Display content (limit very long messages)
-                lines = display_content.split('\n')
+                # Display content (limit very long messages); only split what is shown
                 max_lines_per_msg = 50
+                lines = display_content.split('\n', max_lines_per_msg)[:max_lines_per_msg]
+                # Wrap very long lines
+                lines = [line if len(line) <= 100 else line[:97] + "..." for line in lines]
                 
-                for line_idx, line in enumerate(lines[:max_lines_per_msg]):
-                    # Wrap very long lines
-                    if len(line) > 100:
-                        line = line[:97] + "..."
-                    print(line)
-                    lines_shown += 1
+                # Emit a page-sized block at a time, pausing at the same points as line-by-line
+                start = 0
+                while start < len(lines):
+                    block = lines[start:start + max(1, lines_per_page - lines_shown)]
+                    add("\n".join(block) + "\n")
+                    start += len(block)
+                    lines_shown += len(block)
                     
                     # Check if we need to paginate
                     if lines_shown >= lines_per_page:
+                        sys.stdout.write("".join(out))
+                        out.clear()
                         response = input("\n[Enter] Continue • [Q] Quit: ").strip().upper()
                         if response == "Q":
                             print("\n👋 Stopped viewing")
                             return
                         # Clear screen for next page
-                        print("\033[2J\033[H", end="")
+                        add(_CLEAR_SCREEN)
                         lines_shown = 0
                 
-                if len(lines) > max_lines_per_msg:
-                    print(f"... [{len(lines) - max_lines_per_msg} more lines truncated]")
+                total_lines = display_content.count('\n') + 1
+                if total_lines > max_lines_per_msg:
+                    add(f"... [{total_lines - max_lines_per_msg} more lines truncated]\n")
                     lines_shown += 1
             
-            print("\n" + "=" * 60)
-            print("📄 End of conversation")
-            print("=" * 60)
+            add(f"\n{'=' * 60}\n📄 End of conversation\n{'=' * 60}\n")
+            sys.stdout.write("".join(out))
             input("\nPress Enter to continue...")
             
         except Exception as e:
             print(f"❌ Error displaying conversation: {e}")
             input("\nPress Enter to continue...")
 
+    @staticmethod
+    def _conversation_date(conversation: List[Dict[str, Any]]) -> Tuple[str, str]:
+        """Date and time of the first message, falling back to today's date and no time."""
+        return _split_timestamp(conversation[0].get("timestamp", "")) or (
+            datetime.now().strftime("%Y-%m-%d"), ""
+        )
+
+    def _output_path(self, filename: str) -> Path:
+        """Path for an export file, re-creating the output directory if it was removed."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        return self.output_dir / filename
+
     def save_as_markdown(
         self, conversation: List[Dict[str, str]], session_id: str
     ) -> Optional[Path]:
@@ -919,391 +1541,99 @@ class ClaudeConversationExtractor:
             return None
 
         # Get timestamp from first message
-        first_timestamp = conversation[0].get("timestamp", "")
-        if first_timestamp:
-            try:
-                # Parse ISO timestamp
-                dt = datetime.fromisoformat(first_timestamp.replace("Z", "+00:00"))
-                date_str = dt.strftime("%Y-%m-%d")
-                time_str = dt.strftime("%H:%M:%S")
-            except Exception:
-                date_str = datetime.now().strftime("%Y-%m-%d")
-                time_str = ""
-        else:
-            date_str = datetime.now().strftime("%Y-%m-%d")
-            time_str = ""
+        date_str, time_str = self._conversation_date(conversation)
 
         filename = f"claude-conversation-{date_str}-{session_id[:8]}.md"
-        output_path = self.output_dir / filename
+        output_path = self._output_path(filename)
 
         totals = self._sum_usage(conversation)
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write("# Claude Conversation Log\n\n")
-            f.write(f"Session ID: {session_id}\n")
-            f.write(f"Date: {date_str}")
-            if time_str:
-                f.write(f" {time_str}")
-            f.write("\n")
-            f.write(f"**Total Tokens:** input {totals['input']/1e6:.2f}M | output {totals['output']/1e6:.2f}M\n\n---\n\n")
+        # Collect the whole document and write it once
+        md_parts = []
+        add = md_parts.append
+        add("# Claude Conversation Log\n\n")
+        add(f"Session ID: {session_id}\n")
+        add(f"Date: {date_str}")
+        if time_str:
+            add(f" {time_str}")
+        add("\n")
+        add(f"**Total Tokens:** input {totals['input']/1e6:.2f}M | output {totals['output']/1e6:.2f}M\n\n---\n\n")
 
-            for msg in conversation:
-                role = msg["role"]
-                content = msg["content"]
-                
-                # Handle structured content
-                if isinstance(content, dict):
-                    display_content = self._render_content_to_markdown(content)
-                else:
-                    display_content = str(content)
-                
-                if role == "user":
-                    f.write("## 👤 User\n\n")
-                    f.write(f"{display_content}\n\n")
-                elif role == "assistant":
-                    f.write("## 🤖 Claude\n\n")
-                    f.write(f"{display_content}\n\n")
-                    if msg.get("usage"):
-                        f.write(f"*📊 {self._format_usage_line(msg['usage'], msg.get('model'))}*\n\n")
-                elif role == "subagent_user":
-                    metadata = msg.get("metadata", {})
-                    agent_id = metadata.get("agent_id", "unknown")
-                    subagent_type = metadata.get("subagent_type", "")
-                    subagent_display = f"{subagent_type.upper()}" if subagent_type else f"{agent_id[:8]}..."
-                    f.write(f"## 🤖 Subagent ({subagent_display}) - User\n\n")
-                    f.write(f"{display_content}\n\n")
-                elif role == "subagent_assistant":
-                    metadata = msg.get("metadata", {})
-                    agent_id = metadata.get("agent_id", "unknown")
-                    subagent_type = metadata.get("subagent_type", "")
-                    subagent_display = f"{subagent_type.upper()}" if subagent_type else f"{agent_id[:8]}..."
-                    f.write(f"## 🤖 Subagent ({subagent_display}) - Assistant\n\n")
-                    f.write(f"{display_content}\n\n")
-                    if msg.get("usage"):
-                        f.write(f"*📊 {self._format_usage_line(msg['usage'], msg.get('model'))}*\n\n")
-                elif role == "tool_use":
-                    f.write("### 🔧 Tool Use\n\n")
-                    f.write(f"{display_content}\n\n")
-                elif role == "tool_result":
-                    f.write("### 📤 Tool Result\n\n")
-                    f.write(f"{display_content}\n\n")
-                elif role == "system":
-                    f.write("### ℹ️ System\n\n")
-                    f.write(f"{display_content}\n\n")
-                else:
-                    f.write(f"## {role}\n\n")
-                    f.write(f"{display_content}\n\n")
-                f.write("---\n\n")
+        for msg in conversation:
+            role = msg["role"]
+            content = msg["content"]
+            
+            # Handle structured content
+            if isinstance(content, dict):
+                display_content = self._render_content_to_markdown(content)
+            else:
+                display_content = str(content)
+            
+            heading = _MARKDOWN_ROLE_HEADINGS.get(role)
+            if heading is None:
+                heading = f"## {role}"
+            elif role.startswith("subagent_"):
+                heading = heading.format(subagent=format_subagent_display(msg.get("metadata", {})))
+            add(f"{heading}\n\n{display_content}\n\n")
+            if role in _MARKDOWN_USAGE_ROLES and msg.get("usage"):
+                add(f"*📊 {self._format_usage_line(msg['usage'], msg.get('model'))}*\n\n")
+            add("---\n\n")
+
+        # Encode once and write bytes, bypassing the text layer
+        with open(output_path, "wb") as f:
+            f.write("".join(md_parts).encode("utf-8"))
 
         return output_path
     
     def save_as_json(
-        self, conversation: List[Dict[str, str]], session_id: str
-    ) -> Optional[Path]:
-        """Save conversation as JSON file."""
-        if not conversation:
-            return None
-
-        # Get timestamp from first message
-        first_timestamp = conversation[0].get("timestamp", "")
-        if first_timestamp:
-            try:
-                dt = datetime.fromisoformat(first_timestamp.replace("Z", "+00:00"))
-                date_str = dt.strftime("%Y-%m-%d")
-            except Exception:
-                date_str = datetime.now().strftime("%Y-%m-%d")
-        else:
-            date_str = datetime.now().strftime("%Y-%m-%d")
-
-        filename = f"claude-conversation-{date_str}-{session_id[:8]}.json"
-        output_path = self.output_dir / filename
-
-        # Create JSON structure
-        output = {
-            "session_id": session_id,
-            "date": date_str,
-            "message_count": len(conversation),
-            "total_usage": self._sum_usage(conversation),
-            "messages": conversation
-        }
-
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
-
-        return output_path
-    
-    def save_as_html(
-        self, conversation: List[Dict[str, str]], session_id: str
-    ) -> Optional[Path]:
-        """Save conversation as HTML file with syntax highlighting."""
-        if not conversation:
-            return None
-
-        # Get timestamp from first message
-        first_timestamp = conversation[0].get("timestamp", "")
-        if first_timestamp:
-            try:
-                dt = datetime.fromisoformat(first_timestamp.replace("Z", "+00:00"))
-                date_str = dt.strftime("%Y-%m-%d")
-                time_str = dt.strftime("%H:%M:%S")
-            except Exception:
-                date_str = datetime.now().strftime("%Y-%m-%d")
-                time_str = ""
-        else:
-            date_str = datetime.now().strftime("%Y-%m-%d")
-            time_str = ""
-
-        filename = f"claude-conversation-{date_str}-{session_id[:8]}.html"
-        output_path = self.output_dir / filename
-
-        totals = self._sum_usage(conversation)
-
-        # HTML template with modern styling
-        html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Claude Conversation - {session_id[:8]}</title>
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 1400px;
-            margin: 0 auto;
-            padding: 20px;
-            background: #f5f5f5;
-        }}
-        .header {{
-            background: white;
-            padding: 20px;
-            border-radius: 8px;
-            margin-bottom: 20px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        h1 {{
-            color: #2c3e50;
-            margin: 0 0 10px 0;
-        }}
-        .metadata {{
-            color: #666;
-            font-size: 0.9em;
-        }}
-        .message {{
-            background: white;
-            padding: 15px 20px;
-            margin-bottom: 15px;
-            border-radius: 8px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        .user {{
-            border-left: 4px solid #3498db;
-        }}
-        .assistant {{
-            border-left: 4px solid #2ecc71;
-        }}
-        .tool_use {{
-            border-left: 4px solid #f39c12;
-            background: #fffbf0;
-        }}
-        .tool_result {{
-            border-left: 4px solid #e74c3c;
-            background: #fff5f5;
-        }}
-        .system {{
-            border-left: 4px solid #95a5a6;
-            background: #f8f9fa;
-        }}
-        .subagent_user, .subagent_assistant {{
-            border-left: 4px solid #9b59b6;
-            background: #f8f4ff;
-        }}
-        .role {{
-            font-weight: bold;
-            margin-bottom: 10px;
-            display: flex;
-            align-items: center;
-        }}
-        .content {{
-            white-space: pre-wrap;
-            word-wrap: break-word;
-        }}
-        .content-text {{
-            margin: 5px 0;
-        }}
-        .markdown-body {{
-            white-space: normal;
-            word-wrap: break-word;
-        }}
-        .markdown-body p {{ margin: 0.5em 0; }}
-        .markdown-body ul, .markdown-body ol {{ margin: 0.5em 0; padding-left: 1.5em; }}
-        .markdown-body h1, .markdown-body h2, .markdown-body h3, .markdown-body h4, .markdown-body h5, .markdown-body h6 {{
-            margin: 0.75em 0 0.5em; font-weight: bold;
-        }}
-        .markdown-body h1 {{ font-size: 1.3em; }}
-        .markdown-body h2 {{ font-size: 1.15em; }}
-        .markdown-body h3 {{ font-size: 1.05em; }}
-        .markdown-body pre {{ margin: 0.5em 0; }}
-        .markdown-body blockquote {{ margin: 0.5em 0; padding-left: 1em; border-left: 3px solid #ccc; color: #666; }}
-        .markdown-body table {{ border-collapse: collapse; margin: 0.5em 0; }}
-        .markdown-body th, .markdown-body td {{ border: 1px solid #ddd; padding: 4px 8px; }}
-        .markdown-body a {{ color: #3498db; }}
-        .markdown-body hr {{ margin: 1em 0; border: none; border-top: 1px solid #ddd; }}
-        .thinking-content.markdown-body {{
-            white-space: normal;
-            font-family: inherit;
-        }}
-        .tool-result-content.markdown-body {{
-            white-space: normal;
-            font-family: inherit;
-        }}
-        .content-thinking {{
-            background: #f0f7ff;
-            border-left: 3px solid #4a90e2;
-            padding: 10px;
-            margin: 10px 0;
-            border-radius: 4px;
-        }}
-        .thinking-header {{
-            font-weight: bold;
-            color: #2c5aa0;
-            margin-bottom: 5px;
-            font-size: 0.9em;
-        }}
-        .thinking-content {{
-            white-space: pre-wrap;
-            font-family: 'Courier New', monospace;
-            font-size: 0.9em;
-            color: #333;
-        }}
-        .content-tool-use {{
-            background: #fffbf0;
-            padding: 10px;
-            margin: 10px 0;
-            border-radius: 4px;
-        }}
-        .tool-name {{
-            font-weight: bold;
-            color: #856404;
-            margin-bottom: 5px;
-        }}
-        .tool-input {{
-            background: #f4f4f4;
-            padding: 10px;
-            border-radius: 4px;
-            overflow-x: auto;
-            margin: 0;
-        }}
-        .content-image {{
-            margin: 10px 0;
-            text-align: center;
-        }}
-        .content-image img {{
-            max-width: 100%;
-            height: auto;
-            border-radius: 4px;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }}
-        .content-image-placeholder {{
-            background: #f4f4f4;
-            padding: 20px;
-            border-radius: 4px;
-            text-align: center;
-            color: #666;
-            font-style: italic;
-        }}
-        .content-tool-reference {{
-            background: #fff9e6;
-            padding: 8px;
-            border-radius: 4px;
-            margin: 5px 0;
-        }}
-        .tool-ref-label {{
-            font-weight: bold;
-            color: #856404;
-        }}
-        .content-tool-result {{
-            background: #fff5f5;
-            padding: 10px;
-            margin: 10px 0;
-            border-radius: 4px;
-            border-left: 3px solid #e74c3c;
-        }}
-        .tool-result-header {{
-            font-weight: bold;
-            color: #c0392b;
-            margin-bottom: 5px;
-            font-size: 0.9em;
-        }}
-        .tool-result-content {{
-            white-space: pre-wrap;
-            font-family: 'Courier New', monospace;
-            font-size: 0.9em;
-            color: #333;
-        }}
-        pre {{
-            background: #f4f4f4;
-            padding: 10px;
-            border-radius: 4px;
-            overflow-x: auto;
-        }}
-        code {{
-            background: #f4f4f4;
-            padding: 2px 4px;
-            border-radius: 3px;
-            font-family: 'Courier New', monospace;
-        }}
-        .token-usage {{
-            margin-top: 8px;
-            font-size: 0.82em;
-            color: #666;
-        }}
-        .message-accordion {{ margin-top: 8px; }}
-        .message-accordion summary {{
-            cursor: pointer;
-            font-weight: 600;
-            color: #555;
-            padding: 4px 0;
-        }}
-        .app-layout {{ display: flex; gap: 20px; }}
-        .sidebar {{
-            position: sticky;
-            top: 20px;
-            width: 220px;
-            flex-shrink: 0;
-            max-height: calc(100vh - 40px);
-            overflow-y: auto;
-            background: white;
-            padding: 15px;
-            border-radius: 8px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        .sidebar .nav-header {{ font-weight: bold; margin-bottom: 10px; color: #2c3e50; }}
-        .sidebar .nav-link {{
-            display: block;
-            padding: 6px 8px;
-            margin: 4px 0;
-            border-radius: 4px;
-            border-left: 3px solid transparent;
-            color: #333;
-            text-decoration: none;
-            font-size: 0.85em;
-            white-space: nowrap;
-            overflow: hidden;
-            text-overflow: ellipsis;
-        }}
-        .sidebar .nav-link:hover {{ background: #f0f0f0; }}
-        .sidebar .nav-link.active {{
-            border-left-color: #3498db;
-            background: #e8f4fc;
-            font-weight: 600;
-        }}
-        .content-area {{ flex: 1; max-width: 900px; }}
-    </style>
-</head>
-<body>
-    <div class="app-layout">
+        self, conversation: List[Dict[str, str]], session_id: str
+    ) -> Optional[Path]:
+        """Save conversation as JSON file.
+
+        The file matches json.dumps(indent=2, ensure_ascii=False) byte for byte,
+        except that with orjson installed float exponents are written unpadded
+        (1e16 rather than 1e+16); the parsed values are the same.
+        """
+        if not conversation:
+            return None
+
+        # Get timestamp from first message
+        date_str, _ = self._conversation_date(conversation)
+
+        filename = f"claude-conversation-{date_str}-{session_id[:8]}.json"
+        output_path = self._output_path(filename)
+
+        # Create JSON structure
+        output = {
+            "session_id": session_id,
+            "date": date_str,
+            "message_count": len(conversation),
+            "total_usage": self._sum_usage(conversation),
+            "messages": conversation
+        }
+
+        with open(output_path, "wb") as f:
+            f.write(_json_dumps_pretty_bytes(output))
+
+        return output_path
+    
+    def save_as_html(
+        self, conversation: List[Dict[str, str]], session_id: str
+    ) -> Optional[Path]:
+        """Save conversation as HTML file with syntax highlighting."""
+        if not conversation:
+            return None
+
+        # Get timestamp from first message
+        date_str, time_str = self._conversation_date(conversation)
+
+        filename = f"claude-conversation-{date_str}-{session_id[:8]}.html"
+        output_path = self._output_path(filename)
+
+        totals = self._sum_usage(conversation)
+
+        # Per-session header block; the static head comes from module constants
+        html_content = f"""    <div class="app-layout">
         <main class="content-area">
     <div class="header">
         <h1>Claude Conversation Log</h1>
@@ -1316,130 +1646,72 @@ class ClaudeConversationExtractor:
     </div>
 """
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
+        # Collect the whole document and write it once
+        html_parts = [_HTML_HEAD_PREFIX, session_id[:8], _HTML_HEAD_SUFFIX, html_content]
+        add = html_parts.append
+        
+        for i, msg in enumerate(conversation):
+            role = msg["role"]
+            content = msg["content"]
             
-            for i, msg in enumerate(conversation):
-                role = msg["role"]
-                content = msg["content"]
-                
-                # Render content to HTML
-                rendered_content = self._render_content_to_html(content)
-                
-                # Determine role display
-                if role == "subagent_user":
-                    metadata = msg.get("metadata", {})
-                    agent_id = metadata.get("agent_id", "unknown")
-                    subagent_type = metadata.get("subagent_type", "")
-                    subagent_display = f"{subagent_type.upper()}" if subagent_type else f"{agent_id[:8]}..."
-                    role_display = f"🤖 Subagent ({subagent_display}) - User"
-                elif role == "subagent_assistant":
-                    metadata = msg.get("metadata", {})
-                    agent_id = metadata.get("agent_id", "unknown")
-                    subagent_type = metadata.get("subagent_type", "")
-                    subagent_display = f"{subagent_type.upper()}" if subagent_type else f"{agent_id[:8]}..."
-                    role_display = f"🤖 Subagent ({subagent_display}) - Assistant"
-                else:
-                    role_display = {
-                        "user": "👤 User",
-                        "assistant": "🤖 Claude",
-                        "tool_use": "🔧 Tool Use",
-                        "tool_result": "📤 Tool Result",
-                        "system": "ℹ️ System"
-                    }.get(role, role)
-                
-                use_accordion = self._should_use_accordion(content)
-                if use_accordion:
-                    is_skill = self._is_skill_content(content)
-                    summary_text = self._get_skill_summary(content)
-                    details_open = "" if is_skill else " open"
-                    summary_escaped = escape_html(summary_text)
-
-                msg_id = f"msg-{i}"
-                f.write(f'    <div class="message {role}" id="{msg_id}">\n')
-                f.write(f'        <div class="role">{role_display}</div>\n')
-                if use_accordion:
-                    f.write(f'        <details class="message-accordion"{details_open}>\n')
-                    f.write(f'            <summary>{summary_escaped}</summary>\n')
-                    f.write(f'            <div class="content">{rendered_content}</div>\n')
-                    f.write(f'        </details>\n')
-                else:
-                    f.write(f'        <div class="content">{rendered_content}</div>\n')
-                if msg.get("usage"):
-                    f.write(f'        <div class="token-usage">📊 {self._format_usage_line(msg["usage"], msg.get("model"))}</div>\n')
-                f.write(f'    </div>\n')
+            # Render content to HTML
+            rendered_content = self._render_content_to_html(content)
             
-            f.write(f"""
+            # Determine role display
+            role_display = _HTML_ROLE_LABELS.get(role, role)
+            if role.startswith("subagent_") and role in _HTML_ROLE_LABELS:
+                role_display = role_display.format(
+                    subagent=format_subagent_display(msg.get("metadata", {}))
+                )
+            
+            use_accordion = self._should_use_accordion(content)
+            if use_accordion:
+                is_skill = self._is_skill_content(content)
+                summary_text = self._get_skill_summary(content)
+                details_open = "" if is_skill else " open"
+                summary_escaped = escape_html(summary_text)
+
+            if use_accordion:
+                body_html = (
+                    f'        <details class="message-accordion"{details_open}>\n'
+                    f'            <summary>{summary_escaped}</summary>\n'
+                    f'            <div class="content">{rendered_content}</div>\n'
+                    '        </details>\n'
+                )
+            else:
+                body_html = f'        <div class="content">{rendered_content}</div>\n'
+            usage_html = ""
+            if msg.get("usage"):
+                usage_line = self._format_usage_line(msg["usage"], msg.get("model"))
+                usage_html = f'        <div class="token-usage">📊 {usage_line}</div>\n'
+            add(
+                f'    <div class="message {role}" id="msg-{i}">\n'
+                f'        <div class="role">{role_display}</div>\n'
+                f'{body_html}{usage_html}    </div>\n'
+            )
+        
+        add(f"""
         </main>
         <nav class="sidebar" id="sidebar">
             <div class="nav-header">Quick jump</div>
             {build_sidebar_nav(conversation)}
         </nav>
     </div>
-    <script>
-(function() {{
-    const links = document.querySelectorAll('.sidebar .nav-link');
-    const messages = document.querySelectorAll('.message[id^="msg-"]');
-    const headerOffset = 80;
-    let lastActiveIdx = -1;
-    let updateScheduled = false;
-
-    // Cache nav indices on load (static data)
-    const navIndices = [];
-    links.forEach(function(a) {{
-        const href = a.getAttribute('href');
-        if (href && href.startsWith('#msg-')) {{
-            navIndices.push(parseInt(href.replace('#msg-', ''), 10));
-        }}
-    }});
-    navIndices.sort(function(a, b) {{ return a - b; }});
-
-    function updateActive() {{
-        updateScheduled = false;
-        let currentIdx = -1;
-        let minDist = Infinity;
-        messages.forEach(function(m) {{
-            const rect = m.getBoundingClientRect();
-            const dist = Math.abs(rect.top - headerOffset);
-            if (rect.top < window.innerHeight && rect.bottom > 0 && dist < minDist) {{
-                minDist = dist;
-                currentIdx = parseInt(m.id.replace('msg-', ''), 10);
-            }}
-        }});
-        let activeIdx = -1;
-        for (let i = navIndices.length - 1; i >= 0; i--) {{
-            if (navIndices[i] <= currentIdx) {{
-                activeIdx = navIndices[i];
-                break;
-            }}
-        }}
-        if (currentIdx >= 0 && activeIdx < 0 && navIndices.length > 0) {{ activeIdx = navIndices[0]; }}
-
-        // Only update if changed (reduces DOM updates)
-        if (activeIdx !== lastActiveIdx) {{
-            lastActiveIdx = activeIdx;
-            links.forEach(function(a) {{
-                a.classList.toggle('active', a.getAttribute('href') === '#msg-' + activeIdx);
-            }});
-        }}
-    }}
+""")
+        add(_HTML_FOOTER)
 
-    // Throttle scroll updates to requestAnimationFrame
-    window.addEventListener('scroll', function() {{
-        if (!updateScheduled) {{
-            updateScheduled = true;
-            requestAnimationFrame(updateActive);
-        }}
-    }}, {{ passive: true }});
-    window.addEventListener('load', updateActive);
-    updateActive();
-}})();
-    </script>
-</body>
-</html>""")
+        # Encode once and write bytes, bypassing the text layer
+        with open(output_path, "wb") as f:
+            f.write("".join(html_parts).encode("utf-8"))
 
         return output_path
 
+    _SAVERS = {
+        "markdown": save_as_markdown,
+        "json": save_as_json,
+        "html": save_as_html,
+    }
+
     def save_conversation(
         self, conversation: List[Dict[str, str]], session_id: str, format: str = "markdown"
     ) -> Optional[Path]:
@@ -1450,15 +1722,11 @@ class ClaudeConversationExtractor:
             session_id: Session identifier
             format: Output format ('markdown', 'json', 'html')
         """
-        if format == "markdown":
-            return self.save_as_markdown(conversation, session_id)
-        elif format == "json":
-            return self.save_as_json(conversation, session_id)
-        elif format == "html":
-            return self.save_as_html(conversation, session_id)
-        else:
+        saver = self._SAVERS.get(format)
+        if saver is None:
             print(f"❌ Unsupported format: {format}")
             return None
+        return saver(self, conversation, session_id)
 
     def get_conversation_preview(self, session_path: Path) -> Tuple[str, int]:
         """Get a preview of the conversation's first real user message and message count."""
@@ -1466,12 +1734,13 @@ class ClaudeConversationExtractor:
             first_user_msg = ""
             msg_count = 0
             
-            with open(session_path, 'r', encoding='utf-8') as f:
+            # Binary read: lines after the preview is found are only counted, never decoded
+            with open(session_path, "rb", buffering=_READ_BUFFER_SIZE) as f:
                 for line in f:
                     msg_count += 1
-                    if not first_user_msg:
+                    if not first_user_msg and _USER_TYPE_RE.search(line):
                         try:
-                            data = json.loads(line)
+                            data = _json_loads(line)
                             # Check for user message
                             if data.get("type") == "user" and "message" in data:
                                 msg = data["message"]
@@ -1497,8 +1766,7 @@ class ClaudeConversationExtractor:
                                                     continue
                                                 
                                                 # Remove XML-like tags (command messages, etc)
-                                                import re
-                                                text = re.sub(r'<[^>]+>', '', text).strip()
+                                                text = _XML_TAG_RE.sub('', text).strip()
                                                 
                                                 # Skip command outputs  
                                                 if "is running" in text and "…" in text:
@@ -1517,11 +1785,10 @@ class ClaudeConversationExtractor:
                                     
                                     # Handle string content (less common but possible)
                                     elif isinstance(content, str):
-                                        import re
                                         content = content.strip()
                                         
                                         # Remove XML-like tags
-                                        content = re.sub(r'<[^>]+>', '', content).strip()
+                                        content = _XML_TAG_RE.sub('', content).strip()
                                         
                                         # Skip command outputs
                                         if "is running" in content and "…" in content:
@@ -1537,11 +1804,39 @@ class ClaudeConversationExtractor:
                                                 first_user_msg = content[:100].replace('\n', ' ')
                         except json.JSONDecodeError:
                             continue
+                    if first_user_msg:
+                        # Preview found: count the remaining lines without splitting or parsing them
+                        msg_count += _count_remaining_lines(f)
+                        break
                             
             return first_user_msg or "No preview available", msg_count
         except Exception as e:
             return f"Error: {str(e)[:30]}", 0
 
+    def preview_many(
+        self, session_paths: List[Path], max_workers: Optional[int] = None
+    ) -> List[Tuple[str, int]]:
+        """Compute get_conversation_preview for several files in parallel worker processes.
+        
+        Args:
+            session_paths: Paths to the JSONL files
+            max_workers: Number of worker processes (default: CPU count)
+        
+        Returns:
+            One (preview, message count) tuple per input path, in input order
+        """
+        if len(session_paths) < _PARALLEL_PREVIEW_MIN_FILES or max_workers == 1:
+            return [self.get_conversation_preview(path) for path in session_paths]
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                return list(executor.map(_preview_one, session_paths, chunksize=8))
+        except (OSError, RuntimeError):
+            # Process pools are unavailable on some platforms/sandboxes; fall back to serial
+            return [self.get_conversation_preview(path) for path in session_paths]
+
     def list_recent_sessions(self, limit: int = None) -> List[Path]:
         """List recent sessions with details."""
         sessions = self.find_sessions()
@@ -1556,21 +1851,18 @@ class ClaudeConversationExtractor:
 
         # Show all sessions if no limit specified
         sessions_to_show = sessions[:limit] if limit else sessions
-        for i, session in enumerate(sessions_to_show, 1):
+        previews = self.preview_many(sessions_to_show)
+        for i, (session, (preview, msg_count)) in enumerate(zip(sessions_to_show, previews), 1):
             # Clean up project name (remove hyphens, make readable)
             project = session.parent.name.replace('-', ' ').strip()
             if project.startswith("Users"):
                 project = "~/" + "/".join(project.split()[2:]) if len(project.split()) > 2 else "Home"
             
             session_id = session.stem
-            modified = datetime.fromtimestamp(session.stat().st_mtime)
-
-            # Get file size
-            size = session.stat().st_size
-            size_kb = size / 1024
-            
-            # Get preview and message count
-            preview, msg_count = self.get_conversation_preview(session)
+            # One stat call for both modification time and size
+            st = session.stat()
+            modified = datetime.fromtimestamp(st.st_mtime)
+            size_kb = st.st_size / 1024
 
             # Print formatted info
             print(f"\n{i}. 📁 {project}")
@@ -1598,25 +1890,96 @@ class ClaudeConversationExtractor:
         success = 0
         total = len(indices)
 
+        valid = [idx for idx in indices if 0 <= idx < len(sessions)]
+        exports = self._export_sessions([sessions[idx] for idx in valid], format, detailed)
+
         for idx in indices:
             if 0 <= idx < len(sessions):
-                session_path = sessions[idx]
-                conversation = self.extract_conversation(session_path, detailed=detailed)
-                if conversation:
-                    output_path = self.save_conversation(conversation, session_path.stem, format=format)
+                msg_count, output_path = next(exports)
+                if msg_count:
                     success += 1
-                    msg_count = len(conversation)
-                    print(
-                        f"✅ {success}/{total}: {output_path.name} "
-                        f"({msg_count} messages)"
-                    )
+                    print(_MSG_OK.format(
+                        success=success, total=total, name=output_path.name, count=msg_count
+                    ))
                 else:
-                    print(f"⏭️  Skipped session {idx + 1} (no conversation)")
+                    print(_MSG_SKIP.format(number=idx + 1))
             else:
-                print(f"❌ Invalid session number: {idx + 1}")
+                print(_MSG_INVALID.format(number=idx + 1))
+        # Every result has been consumed; close now so a worker pool shuts down here
+        exports.close()
 
         return success, total
 
+    def _export_session(
+        self, session_path: Path, format: str, detailed: bool
+    ) -> Tuple[int, Optional[Path]]:
+        """Extract and save one session; returns (message count, output path), (0, None) if empty."""
+        conversation = self.extract_conversation(session_path, detailed=detailed)
+        if not conversation:
+            return 0, None
+        return len(conversation), self.save_conversation(conversation, session_path.stem, format=format)
+
+    def _export_sessions(
+        self, session_paths: List[Path], format: str, detailed: bool
+    ) -> Iterator[Tuple[int, Optional[Path]]]:
+        """Yield _export_session results in input order, using worker processes for larger batches."""
+        done = 0
+        if len(session_paths) >= _PARALLEL_EXPORT_MIN_FILES:
+            from concurrent.futures import ProcessPoolExecutor
+            from concurrent.futures.process import BrokenProcessPool
+
+            executor = None
+            futures = []
+            try:
+                executor = ProcessPoolExecutor()
+                # Workers are started as jobs are submitted, so submitting can fail too
+                for path in session_paths:
+                    futures.append(executor.submit(
+                        _export_one, (self.claude_dir, self.output_dir, path, format, detailed)
+                    ))
+            except (OSError, RuntimeError):
+                # Process pools are unavailable on some platforms/sandboxes; export serially
+                if executor is not None:
+                    for future in futures:
+                        future.cancel()
+                    executor.shutdown()
+                executor = None
+
+            if executor is not None:
+                try:
+                    # Results in input order, so progress lines print as sessions finish in order.
+                    # An error raised by an export itself propagates, as in the serial path.
+                    for future in futures:
+                        result = future.result()
+                        done += 1
+                        yield result
+                    return
+                except BrokenProcessPool:
+                    # A worker process died; export the remaining sessions serially
+                    pass
+                finally:
+                    for future in futures:
+                        future.cancel()
+                    executor.shutdown()
+
+        for path in session_paths[done:]:
+            yield self._export_session(path, format, detailed)
+
+
+def _preview_one(session_path: Path) -> Tuple[str, int]:
+    """Worker for preview_many: preview one file without the extractor's __init__ side-effects."""
+    extractor = ClaudeConversationExtractor.__new__(ClaudeConversationExtractor)
+    return extractor.get_conversation_preview(session_path)
+
+
+def _export_one(job: Tuple[Path, Path, Path, str, bool]) -> Tuple[int, Optional[Path]]:
+    """Worker for extract_multiple: export one file without the extractor's __init__ side-effects."""
+    claude_dir, output_dir, session_path, format, detailed = job
+    extractor = ClaudeConversationExtractor.__new__(ClaudeConversationExtractor)
+    extractor.claude_dir = claude_dir
+    extractor.output_dir = output_dir
+    return extractor._export_session(session_path, format, detailed)
+
 
 def open_file(file_path: Path) -> None:
     """Open a file using the system's default application.
@@ -1635,11 +1998,18 @@ def open_file(file_path: Path) -> None:
         print(f"⚠️ Cannot open file automatically: {e}")
 
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="Extract Claude Code conversations to clean markdown files",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
+def _parse_cli_date(value: str) -> datetime:
+    """Parse a YYYY-MM-DD command-line date as a naive datetime at midnight."""
+    try:
+        # Dedicated C parser for the canonical zero-padded form
+        return datetime.combine(date.fromisoformat(value), datetime.min.time())
+    except ValueError:
+        # strptime also accepts unpadded dates such as 2024-1-5
+        return datetime.strptime(value, "%Y-%m-%d")
+
+
+# Examples shown at the end of --help
+_CLI_EPILOG = """
 Examples:
   %(prog)s --list                    # List all available sessions
   %(prog)s --extract 1               # Extract the most recent session
@@ -1656,7 +2026,17 @@ Examples:
   %(prog)s --extract 1 --open        # Extract and open the file automatically
   %(prog)s -s abc12345 --watch       # Live HTML watch (auto-opens browser)
   %(prog)s -s abc12345 --watch --port 9000  # Watch on custom port
-        """,
+        """
+
+
+def _parse_args():
+    """Parse sys.argv with the full argparse parser."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Extract Claude Code conversations to clean markdown files",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=_CLI_EPILOG,
     )
     parser.add_argument("--list", action="store_true", help="List recent sessions")
     parser.add_argument(
@@ -1668,13 +2048,13 @@ Examples:
         "--all", "--logs", action="store_true", help="Extract all sessions"
     )
     parser.add_argument(
-        "--recent", type=int, help="Extract N most recent sessions", default=0
+        "--recent", type=int, help="Extract N most recent sessions"
     )
     parser.add_argument(
         "--output", type=str, help="Output directory for markdown files"
     )
     parser.add_argument(
-        "--limit", type=int, help="Limit for --list command (default: show all)", default=None
+        "--limit", type=int, help="Limit for --list command (default: show all)"
     )
     parser.add_argument(
         "--interactive",
@@ -1705,7 +2085,6 @@ Examples:
     parser.add_argument(
         "--search-speaker",
         choices=["human", "assistant", "both"],
-        default="both",
         help="Filter search by speaker",
     )
     parser.add_argument(
@@ -1716,7 +2095,6 @@ Examples:
     parser.add_argument(
         "--format",
         choices=["markdown", "json", "html"],
-        default="html",
         help="Output format for exported conversations (default: html)"
     )
     parser.add_argument(
@@ -1747,328 +2125,411 @@ Examples:
     parser.add_argument(
         "--port",
         type=int,
-        default=8765,
         help="Port for --watch server (default: 8765)"
     )
 
-    args = parser.parse_args()
+    parser.set_defaults(**_CLI_DEFAULTS)
+    return parser.parse_args()
+
+
+# Values accepted for --format (argparse keeps its own ordered choices for --help)
+_FORMATS = frozenset({"markdown", "json", "html"})
+
+# Default value of every CLI option (argparse dest -> default). _parse_args installs
+# these with set_defaults as well, so the fast path below cannot drift from argparse.
+_CLI_DEFAULTS = {
+    "list": False,
+    "extract": None,
+    "all": False,
+    "recent": 0,
+    "output": None,
+    "limit": None,
+    "interactive": False,
+    "export": None,
+    "search": None,
+    "search_regex": None,
+    "search_date_from": None,
+    "search_date_to": None,
+    "search_speaker": "both",
+    "case_sensitive": False,
+    "format": "html",
+    "open": False,
+    "input_file": None,
+    "session_id": None,
+    "watch": False,
+    "port": 8765,
+}
+
+
+def _fast_parse_args(argv: List[str]):
+    """Parse the common single-flag invocations without importing argparse.
+
+    Handles no arguments, --list, --all/--logs, --extract N[,M...] and --recent N,
+    each optionally followed by --format FORMAT. Returns None for anything else
+    (including malformed values) so argparse parses it and reports errors as usual.
+    """
+    from types import SimpleNamespace
 
-    # Handle interactive mode
-    if args.interactive or (args.export and args.export.lower() == "logs"):
-        from interactive_ui import main as interactive_main
+    defaults = _CLI_DEFAULTS
+    if len(argv) >= 2 and argv[-2] == "--format":
+        if argv[-1] not in _FORMATS:
+            return None
+        defaults = {**_CLI_DEFAULTS, "format": argv[-1]}
+        argv = argv[:-2]
+
+    if not argv:
+        return SimpleNamespace(**defaults)
+    flag = argv[0]
+    if len(argv) == 1:
+        if flag == "--list":
+            return SimpleNamespace(**{**defaults, "list": True})
+        if flag in ("--all", "--logs"):
+            return SimpleNamespace(**{**defaults, "all": True})
+    elif len(argv) == 2:
+        value = argv[1]
+        if flag == "--extract" and value and not value.startswith("-"):
+            return SimpleNamespace(**{**defaults, "extract": value})
+        # isdigit() alone also accepts e.g. "²", which int() rejects; argparse handles those
+        if flag == "--recent" and value.isascii() and value.isdigit():
+            return SimpleNamespace(**{**defaults, "recent": int(value)})
+    return None
+
+
+def _start_watch(jsonl_path: Path, port: int) -> None:
+    """Serve live updates of jsonl_path in the browser (--watch)."""
+    try:
+        from watch_server import WatchServer
+    except ImportError:
+        from .watch_server import WatchServer
+    WatchServer(jsonl_path, port=port).start()
+
+
+def _open_latest_output(extractor: "ClaudeConversationExtractor", format: str) -> None:
+    """Open the most recently written export in the output directory (--open)."""
+    output_files = sorted(
+        extractor.output_dir.glob(f"claude-conversation-*.{format}"),
+        key=lambda x: x.stat().st_mtime,
+        reverse=True
+    )
+    if output_files:
+        open_file(output_files[0])
 
-        interactive_main()
-        return
 
-    # Handle --input parameter (highest priority)
-    if args.input_file:
-        # Validate input file
-        input_path = Path(args.input_file)
-        
-        # Check if file exists
-        if not input_path.exists():
-            print(f"❌ Error: File not found: {input_path}")
-            print(f"   Please check the file path and try again.")
-            return
-        
-        # Check if it's a file (not a directory)
-        if not input_path.is_file():
-            print(f"❌ Error: Path is not a file: {input_path}")
-            return
-        
-        # Check file extension (optional but recommended)
-        if input_path.suffix.lower() != ".jsonl":
-            print(f"⚠️  Warning: File extension is '{input_path.suffix}', expected '.jsonl'")
-            response = input("Continue anyway? (y/N): ").strip().lower()
-            if response != 'y':
-                print("👋 Cancelled")
-                return
-        
-        # Initialize extractor with optional output directory
-        extractor = ClaudeConversationExtractor(args.output)
-        
-        # Watch mode: stream live updates in browser
-        if args.watch:
-            try:
-                from watch_server import WatchServer
-            except ImportError:
-                from .watch_server import WatchServer
-            WatchServer(input_path, port=args.port).start()
-            return
+def _extract_sessions(
+    extractor: "ClaudeConversationExtractor", sessions: List[Path], indices: List[int], args
+) -> None:
+    """Export the selected sessions in detailed mode and report the result."""
+    success, total = extractor.extract_multiple(
+        sessions, indices, format=args.format, detailed=True
+    )
+    print(f"\n✅ Successfully extracted {success}/{total} sessions")
+    # Open the last extracted file if --open is specified
+    if args.open and success > 0:
+        _open_latest_output(extractor, args.format)
 
-        # Extract conversation from the specified file
-        print(f"\n📤 Extracting from: {input_path}")
-        print(f"   Format: {args.format.upper()}")
-        print("   📋 Including detailed tool use and system messages")
-        
-        conversation = extractor.extract_conversation(input_path, detailed=True)
-        
-        if not conversation:
-            print("❌ No conversation found in the file")
-            return
-        
-        # Get session ID from filename
-        session_id = input_path.stem
-        
-        # Save in the requested format
-        output_path = extractor.save_conversation(
-            conversation, 
-            session_id, 
-            format=args.format
-        )
-        
-        if output_path:
-            print(f"✅ Successfully extracted {len(conversation)} messages")
-            print(f"   Saved to: {output_path}")
-        else:
-            print("❌ Failed to save conversation")
-        
-        return
 
-    # Handle --session-id parameter (second priority after --input)
-    if args.session_id:
-        # Initialize extractor with optional output directory
-        extractor = ClaudeConversationExtractor(args.output)
-        
-        # Find session file by ID
-        session_path = extractor.find_session_by_id(args.session_id)
-        
-        if not session_path:
-            print(f"❌ Error: Session not found: {args.session_id}")
-            print(f"   Searched in: {extractor.claude_dir}")
-            print(f"   Please check the session ID and try again.")
-            return
-        
-        # Watch mode: stream live updates in browser
-        if args.watch:
-            try:
-                from watch_server import WatchServer
-            except ImportError:
-                from .watch_server import WatchServer
-            WatchServer(session_path, port=args.port).start()
+def _run_input_file(args) -> None:
+    """--input: export (or watch) a JSONL file given by path."""
+    # Validate input file
+    input_path = Path(args.input_file)
+    
+    # Check if file exists
+    if not input_path.exists():
+        print(f"❌ Error: File not found: {input_path}")
+        print(f"   Please check the file path and try again.")
+        return
+    
+    # Check if it's a file (not a directory)
+    if not input_path.is_file():
+        print(f"❌ Error: Path is not a file: {input_path}")
+        return
+    
+    # Check file extension (optional but recommended)
+    if not args.input_file.lower().endswith(".jsonl"):
+        print(f"⚠️  Warning: File extension is '{input_path.suffix}', expected '.jsonl'")
+        response = input("Continue anyway? (y/N): ").strip().lower()
+        if response not in _AFFIRMATIVE:
+            print("👋 Cancelled")
             return
+    
+    # Initialize extractor with optional output directory
+    extractor = ClaudeConversationExtractor(args.output)
+    
+    # Watch mode: stream live updates in browser
+    if args.watch:
+        _start_watch(input_path, args.port)
+        return
 
-        # Extract conversation from the found file
-        print(f"\n📤 Extracting from: {session_path}")
-        print(f"   Session ID: {args.session_id}")
-        print(f"   Format: {args.format.upper()}")
-        print("   📋 Including detailed tool use and system messages")
-        
-        conversation = extractor.extract_conversation(session_path, detailed=True)
-        
-        if not conversation:
-            print("❌ No conversation found in the file")
-            return
-        
-        # Save in the requested format
-        output_path = extractor.save_conversation(
-            conversation, 
-            args.session_id, 
-            format=args.format
-        )
-        
-        if output_path:
-            print(f"✅ Successfully extracted {len(conversation)} messages")
-            print(f"   Saved to: {output_path}")
-            if args.open:
-                open_file(output_path)
-        else:
-            print("❌ Failed to save conversation")
-        
+    # Extract conversation from the specified file
+    print(f"\n📤 Extracting from: {input_path}")
+    print(f"   Format: {args.format.upper()}")
+    print("   📋 Including detailed tool use and system messages")
+    
+    conversation = extractor.extract_conversation(input_path, detailed=True)
+    
+    if not conversation:
+        print("❌ No conversation found in the file")
         return
+    
+    # Get session ID from filename
+    session_id = input_path.stem
+    
+    # Save in the requested format
+    output_path = extractor.save_conversation(
+        conversation, 
+        session_id, 
+        format=args.format
+    )
+    
+    if output_path:
+        print(f"✅ Successfully extracted {len(conversation)} messages")
+        print(f"   Saved to: {output_path}")
+    else:
+        print("❌ Failed to save conversation")
+
 
+def _run_session_id(args) -> None:
+    """--session-id: export (or watch) a session found by its ID."""
     # Initialize extractor with optional output directory
     extractor = ClaudeConversationExtractor(args.output)
+    
+    # Find session file by ID
+    session_path = extractor.find_session_by_id(args.session_id)
+    
+    if not session_path:
+        print(f"❌ Error: Session not found: {args.session_id}")
+        print(f"   Searched in: {extractor.claude_dir}")
+        print(f"   Please check the session ID and try again.")
+        return
+    
+    # Watch mode: stream live updates in browser
+    if args.watch:
+        _start_watch(session_path, args.port)
+        return
 
-    # Handle search mode
-    if args.search or args.search_regex:
-        from datetime import datetime
+    # Extract conversation from the found file
+    print(f"\n📤 Extracting from: {session_path}")
+    print(f"   Session ID: {args.session_id}")
+    print(f"   Format: {args.format.upper()}")
+    print("   📋 Including detailed tool use and system messages")
+    
+    conversation = extractor.extract_conversation(session_path, detailed=True)
+    
+    if not conversation:
+        print("❌ No conversation found in the file")
+        return
+    
+    # Save in the requested format
+    output_path = extractor.save_conversation(
+        conversation, 
+        args.session_id, 
+        format=args.format
+    )
+    
+    if output_path:
+        print(f"✅ Successfully extracted {len(conversation)} messages")
+        print(f"   Saved to: {output_path}")
+        if args.open:
+            open_file(output_path)
+    else:
+        print("❌ Failed to save conversation")
 
-        from search_conversations import ConversationSearcher
 
-        searcher = ConversationSearcher()
+def _run_search(args) -> None:
+    """--search / --search-regex: list matching conversations and offer to view one."""
+    # Initialize extractor with optional output directory
+    extractor = ClaudeConversationExtractor(args.output)
 
-        # Determine search mode and query
-        if args.search_regex:
-            query = args.search_regex
-            mode = "regex"
-        else:
-            query = args.search
-            mode = "smart"
+    from search_conversations import ConversationSearcher
 
-        # Parse date filters
-        date_from = None
-        date_to = None
-        if args.search_date_from:
-            try:
-                date_from = datetime.strptime(args.search_date_from, "%Y-%m-%d")
-            except ValueError:
-                print(f"❌ Invalid date format: {args.search_date_from}")
-                return
+    searcher = ConversationSearcher()
 
-        if args.search_date_to:
-            try:
-                date_to = datetime.strptime(args.search_date_to, "%Y-%m-%d")
-            except ValueError:
-                print(f"❌ Invalid date format: {args.search_date_to}")
-                return
+    # Determine search mode and query
+    if args.search_regex:
+        # Compiled once here; an invalid pattern is reported before any file is read
+        try:
+            query = re.compile(
+                args.search_regex, 0 if args.case_sensitive else re.IGNORECASE
+            )
+        except re.error as e:
+            print(f"❌ Invalid regex pattern: {e}")
+            return
+        mode = "regex"
+    else:
+        query = args.search
+        mode = "smart"
 
-        # Speaker filter
-        speaker_filter = None if args.search_speaker == "both" else args.search_speaker
-
-        # Perform search
-        print(f"🔍 Searching for: {query}")
-        results = searcher.search(
-            query=query,
-            mode=mode,
-            date_from=date_from,
-            date_to=date_to,
-            speaker_filter=speaker_filter,
-            case_sensitive=args.case_sensitive,
-            max_results=30,
-        )
+    # Parse date filters
+    date_from = None
+    date_to = None
+    if args.search_date_from:
+        try:
+            date_from = _parse_cli_date(args.search_date_from)
+        except ValueError:
+            print(f"❌ Invalid date format: {args.search_date_from}")
+            return
 
-        if not results:
-            print("❌ No matches found.")
+    if args.search_date_to:
+        try:
+            date_to = _parse_cli_date(args.search_date_to)
+        except ValueError:
+            print(f"❌ Invalid date format: {args.search_date_to}")
             return
 
-        print(f"\n✅ Found {len(results)} matches across conversations:")
-
-        # Group and display results
-        results_by_file = {}
-        for result in results:
-            if result.file_path not in results_by_file:
-                results_by_file[result.file_path] = []
-            results_by_file[result.file_path].append(result)
-
-        # Store file paths for potential viewing
-        file_paths_list = []
-        for file_path, file_results in results_by_file.items():
-            file_paths_list.append(file_path)
-            print(f"\n{len(file_paths_list)}. 📄 {file_path.parent.name} ({len(file_results)} matches)")
-            # Show first match preview
-            first = file_results[0]
-            print(f"   {first.speaker}: {first.matched_content[:100]}...")
-
-        # Offer to view conversations
-        if file_paths_list:
-            print("\n" + "=" * 60)
-            try:
-                view_choice = input("\nView a conversation? Enter number (1-{}) or press Enter to skip: ".format(
-                    len(file_paths_list))).strip()
-                
-                if view_choice.isdigit():
-                    view_num = int(view_choice)
-                    if 1 <= view_num <= len(file_paths_list):
-                        selected_path = file_paths_list[view_num - 1]
-                        extractor.display_conversation(selected_path, detailed=True)
-                        
-                        # Offer to extract after viewing
-                        extract_choice = input("\n📤 Extract this conversation? (y/N): ").strip().lower()
-                        if extract_choice == 'y':
-                            conversation = extractor.extract_conversation(selected_path, detailed=True)
-                            if conversation:
-                                session_id = selected_path.stem
-                                if args.format == "json":
-                                    output = extractor.save_as_json(conversation, session_id)
-                                elif args.format == "html":
-                                    output = extractor.save_as_html(conversation, session_id)
-                                else:
-                                    output = extractor.save_as_markdown(conversation, session_id)
-                                print(f"✅ Saved: {output.name}")
-                                if args.open and output:
-                                    open_file(output)
-            except (EOFError, KeyboardInterrupt):
-                print("\n👋 Cancelled")
-        
+    # Speaker filter
+    speaker_filter = None if args.search_speaker == "both" else args.search_speaker
+
+    # Perform search
+    print(f"🔍 Searching for: {args.search_regex or args.search}")
+    results = searcher.search(
+        query=query,
+        mode=mode,
+        date_from=date_from,
+        date_to=date_to,
+        speaker_filter=speaker_filter,
+        case_sensitive=args.case_sensitive,
+        max_results=30,
+    )
+
+    if not results:
+        print("❌ No matches found.")
         return
 
-    # Default action is to list sessions
-    if args.list or (
-        not args.extract
-        and not args.all
-        and not args.recent
-        and not args.search
-        and not args.search_regex
-    ):
-        sessions = extractor.list_recent_sessions(args.limit)
-
-        if sessions and not args.list:
-            print("\nTo extract conversations:")
-            print("  claude-extract --extract <number>      # Extract specific session")
-            print("  claude-extract --recent 5              # Extract 5 most recent")
-            print("  claude-extract --all                   # Extract all sessions")
-
-    elif args.extract:
-        sessions = extractor.find_sessions()
-
-        # Parse comma-separated indices
+    print(f"\n✅ Found {len(results)} matches across conversations:")
+
+    # Group and display results
+    results_by_file = defaultdict(list)
+    for result in results:
+        results_by_file[result.file_path].append(result)
+
+    # Store file paths for potential viewing; the listing is printed in one write
+    file_paths_list = list(results_by_file)
+    listing = []
+    for number, (file_path, file_results) in enumerate(results_by_file.items(), 1):
+        listing.append(f"\n{number}. 📄 {file_path.parent.name} ({len(file_results)} matches)")
+        # Show first match preview
+        first = file_results[0]
+        listing.append(f"   {first.speaker}: {first.matched_content[:100]}...")
+    print("\n".join(listing))
+
+    # Offer to view conversations
+    if file_paths_list:
+        print("\n" + "=" * 60)
+        try:
+            view_choice = input("\nView a conversation? Enter number (1-{}) or press Enter to skip: ".format(
+                len(file_paths_list))).strip()
+            
+            if view_choice.isdigit():
+                view_num = int(view_choice)
+                if 1 <= view_num <= len(file_paths_list):
+                    selected_path = file_paths_list[view_num - 1]
+                    # Parse once; the same messages are viewed and then saved
+                    conversation = extractor.extract_conversation(selected_path, detailed=True)
+                    extractor.display_conversation(
+                        selected_path, detailed=True, conversation=conversation
+                    )
+                    
+                    # Offer to extract after viewing
+                    extract_choice = input("\n📤 Extract this conversation? (y/N): ").strip().lower()
+                    if extract_choice in _AFFIRMATIVE:
+                        if conversation:
+                            output = extractor.save_conversation(
+                                conversation, selected_path.stem, format=args.format
+                            )
+                            print(f"✅ Saved: {output.name}")
+                            if args.open and output:
+                                open_file(output)
+        except (EOFError, KeyboardInterrupt):
+            print("\n👋 Cancelled")
+
+
+def _run_list(args) -> None:
+    """--list, and the default with no action flag: show recent sessions."""
+    extractor = ClaudeConversationExtractor(args.output)
+    sessions = extractor.list_recent_sessions(args.limit)
+
+    if sessions and not args.list:
+        print("\nTo extract conversations:")
+        print("  claude-extract --extract <number>      # Extract specific session")
+        print("  claude-extract --recent 5              # Extract 5 most recent")
+        print("  claude-extract --all                   # Extract all sessions")
+
+
+def _run_extract(args) -> None:
+    """--extract N[,M...]: export sessions by their --list number."""
+    extractor = ClaudeConversationExtractor(args.output)
+
+    # Parse comma-separated indices (int() ignores surrounding whitespace)
+    numbers = args.extract.split(",")
+    try:
+        indices = [n - 1 for n in map(int, numbers)]  # Convert to 0-based index
+    except ValueError:
+        # Some token is bad: parse one at a time to report each invalid one
         indices = []
-        for num in args.extract.split(","):
+        for num in numbers:
             try:
-                idx = int(num.strip()) - 1  # Convert to 0-based index
-                indices.append(idx)
+                indices.append(int(num) - 1)
             except ValueError:
-                print(f"❌ Invalid session number: {num}")
-                continue
-
-        if indices:
-            print(f"\n📤 Extracting {len(indices)} session(s) as {args.format.upper()}...")
-            print("📋 Including detailed tool use and system messages")
-            success, total = extractor.extract_multiple(
-                sessions, indices, format=args.format, detailed=True
-            )
-            print(f"\n✅ Successfully extracted {success}/{total} sessions")
-            # Open the last extracted file if --open is specified
-            if args.open and success > 0:
-                output_files = sorted(
-                    extractor.output_dir.glob(f"claude-conversation-*.{args.format}"),
-                    key=lambda x: x.stat().st_mtime,
-                    reverse=True
-                )
-                if output_files:
-                    open_file(output_files[0])
+                print(_MSG_INVALID.format(number=num))
 
-    elif args.recent:
-        sessions = extractor.find_sessions()
-        limit = min(args.recent, len(sessions))
-        print(f"\n📤 Extracting {limit} most recent sessions as {args.format.upper()}...")
+    if indices:
+        # Only the newest max(indices) + 1 sessions can be selected
+        sessions = extractor.find_sessions(limit=max(max(indices) + 1, 0))
+        print(f"\n📤 Extracting {len(indices)} session(s) as {args.format.upper()}...")
         print("📋 Including detailed tool use and system messages")
+        _extract_sessions(extractor, sessions, indices, args)
 
-        indices = list(range(limit))
-        success, total = extractor.extract_multiple(
-            sessions, indices, format=args.format, detailed=True
-        )
-        print(f"\n✅ Successfully extracted {success}/{total} sessions")
-        # Open the last extracted file if --open is specified
-        if args.open and success > 0:
-            output_files = sorted(
-                extractor.output_dir.glob(f"claude-conversation-*.{args.format}"),
-                key=lambda x: x.stat().st_mtime,
-                reverse=True
-            )
-            if output_files:
-                open_file(output_files[0])
 
-    elif args.all:
-        sessions = extractor.find_sessions()
-        print(f"\n📤 Extracting all {len(sessions)} sessions as {args.format.upper()}...")
-        print("📋 Including detailed tool use and system messages")
+def _run_recent(args) -> None:
+    """--recent N: export the N most recent sessions."""
+    extractor = ClaudeConversationExtractor(args.output)
+    sessions = extractor.find_sessions(limit=args.recent)
+    limit = min(args.recent, len(sessions))
+    print(f"\n📤 Extracting {limit} most recent sessions as {args.format.upper()}...")
+    print("📋 Including detailed tool use and system messages")
+    _extract_sessions(extractor, sessions, list(range(limit)), args)
 
-        indices = list(range(len(sessions)))
-        success, total = extractor.extract_multiple(
-            sessions, indices, format=args.format, detailed=True
-        )
-        print(f"\n✅ Successfully extracted {success}/{total} sessions")
-        # Open the last extracted file if --open is specified
-        if args.open and success > 0:
-            output_files = sorted(
-                extractor.output_dir.glob(f"claude-conversation-*.{args.format}"),
-                key=lambda x: x.stat().st_mtime,
-                reverse=True
-            )
-            if output_files:
-                open_file(output_files[0])
+
+def _run_all(args) -> None:
+    """--all / --logs: export every session."""
+    extractor = ClaudeConversationExtractor(args.output)
+    # Keep the --list order so progress and "Skipped session N" numbers match it
+    sessions = extractor.find_sessions()
+    print(f"\n📤 Extracting all {len(sessions)} sessions as {args.format.upper()}...")
+    print("📋 Including detailed tool use and system messages")
+    _extract_sessions(extractor, sessions, list(range(len(sessions))), args)
+
+
+# CLI actions in priority order: the first argument that is set picks the handler,
+# and with none set the recent sessions are listed
+_CLI_ACTIONS = (
+    ("input_file", _run_input_file),
+    ("session_id", _run_session_id),
+    ("search", _run_search),
+    ("search_regex", _run_search),
+    ("list", _run_list),
+    ("extract", _run_extract),
+    ("recent", _run_recent),
+    ("all", _run_all),
+)
+
+
+def main():
+    args = _fast_parse_args(sys.argv[1:])
+    if args is None:
+        args = _parse_args()
+
+    # Handle interactive mode
+    if args.interactive or (args.export and args.export.lower() == "logs"):
+        from interactive_ui import main as interactive_main
+
+        interactive_main()
+        return
+
+    for name, handler in _CLI_ACTIONS:
+        if getattr(args, name):
+            return handler(args)
+    return _run_list(args)
 
 
 def launch_watch():
@@ -2109,14 +2570,14 @@ def launch_interactive():
         selected_file = rts.run()
         
         if selected_file:
-            # View the selected conversation
-            extractor.display_conversation(selected_file)
+            # View the selected conversation (parsed once, reused for extraction)
+            conversation = extractor.extract_conversation(selected_file)
+            extractor.display_conversation(selected_file, conversation=conversation)
             
             # Offer to extract
             try:
                 extract_choice = input("\n📤 Extract this conversation? (y/N): ").strip().lower()
-                if extract_choice == 'y':
-                    conversation = extractor.extract_conversation(selected_file)
+                if extract_choice in _AFFIRMATIVE:
                     if conversation:
                         session_id = selected_file.stem
                         output = extractor.save_as_markdown(conversation, session_id)
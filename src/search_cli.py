@@ -61,7 +61,7 @@ def main():
         sessions = []
         session_paths = []
         extractor = ClaudeConversationExtractor()
-        all_sessions = extractor.find_sessions()
+        all_sessions = extractor.find_sessions(sort=False)
         
         for i, (fname, file_results) in enumerate(by_file.items(), 1):
             session_id = fname.replace('.jsonl', '')
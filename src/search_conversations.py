@@ -14,10 +14,18 @@ Adapted from CAKE's conversation parser for Claude conversation search.
 
 import json
 import re
+import sys
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Pattern, Set, Union
+
+# orjson when installed, else the stdlib parser, retrying what orjson rejects. Session
+# files are read as bytes, which both decoders accept directly (whitespace included).
+try:
+    from .extract_claude_logs import _json_loads
+except ImportError:
+    from extract_claude_logs import _json_loads
 
 # Optional NLP imports for semantic search
 try:
@@ -29,8 +37,11 @@ except ImportError:
     print("Note: Install spacy for enhanced semantic search capabilities")
     print("      pip install spacy && python -m spacy download en_core_web_sm")
 
+# Searches can return many results; slot them where dataclass supports it (3.10+)
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_DATACLASS_OPTIONS)
 class SearchResult:
     """Represents a search result with context"""
 
@@ -127,7 +138,7 @@ class ConversationSearcher:
 
     def search(
         self,
-        query: str,
+        query: Union[str, Pattern[str]],
         search_dir: Optional[Path] = None,
         mode: str = "smart",
         date_from: Optional[datetime] = None,
@@ -140,7 +151,8 @@ class ConversationSearcher:
         Search conversations with various filters.
 
         Args:
-            query: Search query (text or regex pattern)
+            query: Search query (text or regex pattern); regex mode also accepts a
+                compiled pattern, whose own flags then take precedence over case_sensitive
             search_dir: Directory to search in (default: ~/.claude/projects)
             mode: Search mode - "smart", "exact", "regex", "semantic"
             date_from: Filter results from this date
@@ -161,9 +173,18 @@ class ConversationSearcher:
             raise ValueError(f"Search directory does not exist: {search_dir}")
 
         # Return empty results for empty query
-        if not query or not query.strip():
+        query_text = query.pattern if isinstance(query, re.Pattern) else query
+        if not query_text or not query_text.strip():
             return []
 
+        # Compile a regex query once for all files (an invalid pattern is reported once)
+        if mode == "regex" and not isinstance(query, re.Pattern):
+            try:
+                query = re.compile(query, 0 if case_sensitive else re.IGNORECASE)
+            except re.error as e:
+                print(f"Invalid regex pattern: {e}")
+                return []
+
         # Find all JSONL files
         jsonl_files = list(search_dir.rglob("*.jsonl"))
         if not jsonl_files:
@@ -245,12 +266,12 @@ class ConversationSearcher:
 
         # Read and parse JSONL
         try:
-            with open(jsonl_file, "r", encoding="utf-8") as f:
+            with open(jsonl_file, "rb") as f:
                 line_num = 0
                 for line in f:
                     line_num += 1
                     try:
-                        entry = json.loads(line.strip())
+                        entry = _json_loads(line)
 
                         # Extract message based on entry type
                         if entry.get("type") in ["user", "assistant"]:
@@ -323,12 +344,12 @@ class ConversationSearcher:
         search_query = query if case_sensitive else query.lower()
 
         try:
-            with open(jsonl_file, "r", encoding="utf-8") as f:
+            with open(jsonl_file, "rb") as f:
                 line_num = 0
                 for line in f:
                     line_num += 1
                     try:
-                        entry = json.loads(line.strip())
+                        entry = _json_loads(line)
 
                         if entry.get("type") in ["user", "assistant"]:
                             speaker = (
@@ -389,7 +410,7 @@ class ConversationSearcher:
     def _search_regex(
         self,
         jsonl_file: Path,
-        pattern: str,
+        pattern: Union[str, Pattern[str]],
         speaker_filter: Optional[str],
         case_sensitive: bool,
     ) -> List[SearchResult]:
@@ -397,21 +418,24 @@ class ConversationSearcher:
         results = []
         conversation_id = jsonl_file.stem
 
-        # Compile regex pattern
-        try:
-            flags = 0 if case_sensitive else re.IGNORECASE
-            regex = re.compile(pattern, flags)
-        except re.error as e:
-            print(f"Invalid regex pattern: {e}")
-            return []
+        # Compile regex pattern (search() passes it precompiled)
+        if isinstance(pattern, re.Pattern):
+            regex = pattern
+        else:
+            try:
+                flags = 0 if case_sensitive else re.IGNORECASE
+                regex = re.compile(pattern, flags)
+            except re.error as e:
+                print(f"Invalid regex pattern: {e}")
+                return []
 
         try:
-            with open(jsonl_file, "r", encoding="utf-8") as f:
+            with open(jsonl_file, "rb") as f:
                 line_num = 0
                 for line in f:
                     line_num += 1
                     try:
-                        entry = json.loads(line.strip())
+                        entry = _json_loads(line)
 
                         if entry.get("type") in ["user", "assistant"]:
                             speaker = (
@@ -489,12 +513,12 @@ class ConversationSearcher:
         ]
 
         try:
-            with open(jsonl_file, "r", encoding="utf-8") as f:
+            with open(jsonl_file, "rb") as f:
                 line_num = 0
                 for line in f:
                     line_num += 1
                     try:
-                        entry = json.loads(line.strip())
+                        entry = _json_loads(line)
 
                         if entry.get("type") in ["user", "assistant"]:
                             speaker = (
@@ -720,10 +744,10 @@ class ConversationSearcher:
         # Collect all content
         all_content = []
         try:
-            with open(jsonl_file, "r", encoding="utf-8") as f:
+            with open(jsonl_file, "rb") as f:
                 for line in f:
                     try:
-                        entry = json.loads(line.strip())
+                        entry = _json_loads(line)
                         content = self._extract_content(entry)
                         if content:
                             all_content.append(content)
@@ -783,10 +807,10 @@ def create_search_index(search_dir: Path, output_file: Path) -> None:
 
         # Parse file
         try:
-            with open(jsonl_file, "r", encoding="utf-8") as f:
+            with open(jsonl_file, "rb") as f:
                 for line in f:
                     try:
-                        entry = json.loads(line.strip())
+                        entry = _json_loads(line)
                         if entry.get("type") in ["user", "assistant"]:
                             metadata["message_count"] += 1
                             speaker = (
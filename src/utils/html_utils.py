@@ -1,10 +1,9 @@
 """HTML-related utilities."""
 
+import html
+
 
 def escape_html(text: str) -> str:
     """Escape HTML special characters."""
-    return (text.replace("&", "&amp;")
-               .replace("<", "&lt;")
-               .replace(">", "&gt;")
-               .replace('"', "&quot;")
-               .replace("'", "&#x27;"))
+    # html.escape emits the same entities (&amp; &lt; &gt; &quot; &#x27;) as the old replace chain
+    return html.escape(text, quote=True)
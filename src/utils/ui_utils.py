@@ -3,6 +3,19 @@
 from typing import List, Dict, Any, Optional
 from .html_utils import escape_html
 
+# Sidebar/role labels by message role; subagent roles are templates for the agent name
+_NAV_LABELS = {
+    "user": "👤 User",
+    "assistant": "🤖 Claude",
+    "tool_use": "🔧 Tool",
+    "tool_result": "📤 Result",
+    "system": "ℹ️ System"
+}
+_SUBAGENT_NAV_LABELS = {
+    "subagent_user": "🤖 Subagent ({}) - User",
+    "subagent_assistant": "🤖 Subagent ({}) - Assistant",
+}
+
 
 def is_human_user_message(entry: dict) -> bool:
     """Detect if user message is from human input (not system injection)."""
@@ -32,20 +45,10 @@ def get_nav_label(msg: dict) -> str:
         return "👤 User"
     if role == "assistant" and metadata.get("subagent_start"):
         return "🤖 Claude → Subagent"
-    if role == "subagent_user":
-        disp = format_subagent_display(metadata)
-        return f"🤖 Subagent ({disp}) - User"
-    if role == "subagent_assistant":
-        disp = format_subagent_display(metadata)
-        return f"🤖 Subagent ({disp}) - Assistant"
-
-    return {
-        "user": "👤 User",
-        "assistant": "🤖 Claude",
-        "tool_use": "🔧 Tool",
-        "tool_result": "📤 Result",
-        "system": "ℹ️ System"
-    }.get(role, role)
+    if role in _SUBAGENT_NAV_LABELS:
+        return _SUBAGENT_NAV_LABELS[role].format(format_subagent_display(metadata))
+
+    return _NAV_LABELS.get(role, role)
 
 
 def build_sidebar_nav(conversation: List[Dict]) -> str:
@@ -9,21 +9,25 @@ Or via CLI:
     claude-extract -s {session_id} --watch [--port 8765]
 """
 
-import json
+import gzip
 import os
 import platform
 import queue
 import subprocess
+import sys
 import threading
-import time
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
 
 try:
-    from .extract_claude_logs import ClaudeConversationExtractor
+    from .extract_claude_logs import (
+        ClaudeConversationExtractor, _MESSAGE_TYPE_RE, _READ_BUFFER_SIZE, _json_loads
+    )
 except ImportError:
-    from extract_claude_logs import ClaudeConversationExtractor
+    from extract_claude_logs import (
+        ClaudeConversationExtractor, _MESSAGE_TYPE_RE, _READ_BUFFER_SIZE, _json_loads
+    )
 
 try:
     from utils.html_utils import escape_html
@@ -32,6 +36,26 @@ except ImportError:
     from .utils.html_utils import escape_html
     from .utils.ui_utils import is_human_user_message, get_nav_label, build_sidebar_nav
 
+# Optional OS file-change notifications (inotify / FSEvents / ReadDirectoryChangesW);
+# without watchfiles the session file is polled every _POLL_INTERVAL seconds
+try:
+    from watchfiles import watch as _watch_files
+except ImportError:
+    _watch_files = None
+
+_POLL_INTERVAL = 0.5
+# The session file stays open between reads, except on Windows: there an open handle
+# stops the writer renaming or deleting the file, and st_ino cannot tell a replaced
+# file apart, so it is reopened for every read
+_KEEP_SESSION_FILE_OPEN = os.name != "nt"
+# Pending SSE messages kept per client; a client that falls this far behind loses
+# its oldest messages instead of growing memory or slowing other clients
+_SUBSCRIBER_QUEUE_SIZE = 256
+# Parsed messages waiting to be rendered (see _render_loop)
+_RENDER_QUEUE_SIZE = 1024
+# Messages appended together are sent as one SSE event, split once it reaches this size
+_BROADCAST_BATCH_SIZE = 64 * 1024
+
 
 # CSS shared with extract_claude_logs.py save_as_html (kept in sync manually)
 _CSS = """
@@ -261,6 +285,115 @@ _CSS = """
 """
 
 
+# Static parts of the live page, encoded once: the head up to the session id in the
+# <title>, the rest of the head (stylesheet included), and the tail after the
+# sidebar (status bar and client script)
+_PAGE_HEAD_PREFIX = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Claude Watch \u2014 """.encode("utf-8")
+_PAGE_HEAD_SUFFIX = ("""</title>
+    <style>""" + _CSS + """
+    </style>
+</head>
+<body>
+""").encode("utf-8")
+_PAGE_TAIL = """    <div id="status-bar">\U0001f7e2 Connected</div>
+    <script>
+        const es = new EventSource('/events');
+        const statusBar = document.getElementById('status-bar');
+        es.onmessage = function(e) {
+            const html = e.data;
+            const isAtBottom = (window.innerHeight + window.scrollY) >= document.body.offsetHeight - 100;
+            document.getElementById('messages').insertAdjacentHTML('beforeend', html);
+            if (isAtBottom) {
+                window.scrollTo(0, document.body.scrollHeight);
+            }
+        };
+        es.onerror = function() {
+            statusBar.textContent = '\U0001f534 Disconnected \u2014 reload to reconnect';
+        };
+        es.onopen = function() {
+            statusBar.textContent = '\U0001f7e2 Connected';
+        };
+        (function() {
+            const links = document.querySelectorAll('.sidebar .nav-link');
+            const messages = document.querySelectorAll('.message[id^="msg-"]');
+            const headerOffset = 80;
+            let lastActiveIdx = -1;
+            let updateScheduled = false;
+
+            // Cache nav indices on load (static data)
+            const navIndices = [];
+            links.forEach(function(a) {
+                const href = a.getAttribute('href');
+                if (href && href.startsWith('#msg-')) {
+                    navIndices.push(parseInt(href.replace('#msg-', ''), 10));
+                }
+            });
+            navIndices.sort(function(a, b) { return a - b; });
+
+            function updateActive() {
+                updateScheduled = false;
+                let currentIdx = -1;
+                let minDist = Infinity;
+                messages.forEach(function(m) {
+                    const rect = m.getBoundingClientRect();
+                    const dist = Math.abs(rect.top - headerOffset);
+                    if (rect.top < window.innerHeight && rect.bottom > 0 && dist < minDist) {
+                        minDist = dist;
+                        currentIdx = parseInt(m.id.replace('msg-', ''), 10);
+                    }
+                });
+                let activeIdx = -1;
+                for (let i = navIndices.length - 1; i >= 0; i--) {
+                    if (navIndices[i] <= currentIdx) {
+                        activeIdx = navIndices[i];
+                        break;
+                    }
+                }
+                if (currentIdx >= 0 && activeIdx < 0 && navIndices.length > 0) { activeIdx = navIndices[0]; }
+
+                // Only update if changed (reduces DOM updates)
+                if (activeIdx !== lastActiveIdx) {
+                    lastActiveIdx = activeIdx;
+                    links.forEach(function(a) {
+                        a.classList.toggle('active', a.getAttribute('href') === '#msg-' + activeIdx);
+                    });
+                }
+            }
+
+            // Throttle scroll updates to 100ms
+            window.addEventListener('scroll', function() {
+                if (!updateScheduled) {
+                    updateScheduled = true;
+                    requestAnimationFrame(updateActive);
+                }
+            }, { passive: true });
+            window.addEventListener('load', updateActive);
+        })();
+    </script>
+</body>
+</html>""".encode("utf-8")
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """True if an Accept-Encoding header value allows gzip (q=0 declines it)."""
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() == "gzip":
+            params = params.replace(" ", "").lower()
+            if params.startswith("q="):
+                try:
+                    return float(params[2:]) > 0
+                except ValueError:
+                    pass
+            return True
+    return False
+
+
 def _open_url(url: str) -> None:
     """Open a URL in the default browser."""
     try:
@@ -279,7 +412,7 @@ class WatchServer:
     HTTP server that serves a live-updating HTML view of a JSONL session.
 
     - GET /       → full initial HTML with existing messages
-    - GET /events → SSE stream; pushes new message HTML as JSON-encoded strings
+    - GET /events → SSE stream; pushes new message HTML as multi-line data fields
     """
 
     def __init__(self, jsonl_path: Path, port: int = 8765):
@@ -296,36 +429,59 @@ class WatchServer:
         self._tool_use_to_subagent_type: Dict[str, str] = {}
         self._last_offset: int = 0
         self._last_size: int = 0
+        # Bytes of a trailing line the writer has not finished yet
+        self._residual: bytes = b""
+        # Session file, kept open between reads (see _session_file)
+        self._fh: Optional[BinaryIO] = None
 
         # SSE subscriber queues
-        self._subscribers: List[queue.Queue] = []
+        # Replaced (never mutated) under the lock, so a broadcast can iterate the
+        # current tuple without taking the lock at all
+        self._subscribers: Tuple[queue.Queue, ...] = ()
         self._subscribers_lock = threading.Lock()
         # Message count for SSE-assigned ids (initial + newly broadcast)
         self._message_count: int = 0
+        # Set on shutdown to end the file watch / poll loop and the render thread
+        self._stop = threading.Event()
+        # Parsed messages from the poll thread waiting for the render thread; when
+        # rendering falls this far behind, reading pauses until it catches up
+        self._render_q: queue.Queue = queue.Queue(maxsize=_RENDER_QUEUE_SIZE)
 
     # ------------------------------------------------------------------ #
     # SSE pub/sub helpers
     # ------------------------------------------------------------------ #
 
     def _subscribe(self) -> queue.Queue:
-        q: queue.Queue = queue.Queue()
+        q: queue.Queue = queue.Queue(maxsize=_SUBSCRIBER_QUEUE_SIZE)
         with self._subscribers_lock:
-            self._subscribers.append(q)
+            self._subscribers = self._subscribers + (q,)
         return q
 
     def _unsubscribe(self, q: queue.Queue) -> None:
         with self._subscribers_lock:
-            try:
-                self._subscribers.remove(q)
-            except ValueError:
-                pass
+            self._subscribers = tuple(s for s in self._subscribers if s is not q)
 
     def _broadcast(self, html_fragment: str) -> None:
-        """Push a JSON-encoded HTML fragment to all connected SSE clients."""
-        payload = json.dumps(html_fragment)
-        with self._subscribers_lock:
-            for q in self._subscribers:
-                q.put(payload)
+        """Push an HTML fragment to all connected SSE clients."""
+        # Build the complete SSE frame once; each client thread writes it as is. The
+        # HTML goes out unencoded, one data: field per line, which the browser joins
+        # back together with newlines.
+        lines = html_fragment.replace("\r\n", "\n").replace("\r", "\n")
+        # Lone surrogates (truncated emoji) cannot be encoded; they are sent as "?"
+        payload = ("data: " + lines.replace("\n", "\ndata: ") + "\n\n").encode(
+            "utf-8", "replace"
+        )
+        for q in self._subscribers:
+            while True:
+                try:
+                    q.put_nowait(payload)
+                    break
+                except queue.Full:
+                    # Drop the oldest pending message for this client and retry
+                    try:
+                        q.get_nowait()
+                    except queue.Empty:
+                        pass
 
     # ------------------------------------------------------------------ #
     # Incremental JSONL parsing
@@ -344,10 +500,10 @@ class WatchServer:
             msg = entry["message"]
             if isinstance(msg, dict) and msg.get("role") == "user":
                 content = msg.get("content", "")
-                rich = self._extractor._extract_rich_content(content, detailed=True)
-                rich = self._extractor._fill_tool_names(rich, self._tool_use_to_name)
-                text = rich.get("text", "") if isinstance(rich, dict) else str(rich)
-                if text and text.strip():
+                rich = self._extractor._extract_rich_content(
+                    content, detailed=True, tool_use_to_name=self._tool_use_to_name
+                )
+                if self._extractor._has_text(rich):
                     return {
                         "role": "user",
                         "content": rich,
@@ -359,24 +515,25 @@ class WatchServer:
             msg = entry["message"]
             if isinstance(msg, dict) and msg.get("role") == "assistant":
                 content = msg.get("content", [])
-                # Track tool uses for name/subagent resolution
+                # Track Task/Agent tool uses for subagent resolution (tool names are
+                # recorded by _extract_rich_content)
                 subagent_start = False
                 if isinstance(content, list):
                     for item in content:
-                        if isinstance(item, dict) and item.get("type") == "tool_use":
+                        if (isinstance(item, dict) and item.get("type") == "tool_use"
+                                and item.get("name") in ("Task", "Agent")):
+                            subagent_start = True
                             tool_id = item.get("id", "")
-                            tool_name = item.get("name", "")
-                            if tool_id and tool_name:
-                                self._tool_use_to_name[tool_id] = tool_name
-                            if tool_name in ("Task", "Agent"):
-                                subagent_start = True
-                                subagent_type = item.get("input", {}).get("subagent_type", "")
-                                if subagent_type and tool_id:
-                                    self._tool_use_to_subagent_type[tool_id] = subagent_type
-                rich = self._extractor._extract_rich_content(content, detailed=True)
-                rich = self._extractor._fill_tool_names(rich, self._tool_use_to_name)
-                text = rich.get("text", "") if isinstance(rich, dict) else str(rich)
-                if text and text.strip():
+                            subagent_type = item.get("input", {}).get("subagent_type", "")
+                            if subagent_type and tool_id:
+                                # Interned like the extractor's; only str can be interned
+                                if type(subagent_type) is str:
+                                    subagent_type = sys.intern(subagent_type)
+                                self._tool_use_to_subagent_type[tool_id] = subagent_type
+                rich = self._extractor._extract_rich_content(
+                    content, detailed=True, tool_use_to_name=self._tool_use_to_name
+                )
+                if self._extractor._has_text(rich):
                     return {
                         "role": "assistant",
                         "content": rich,
@@ -403,18 +560,10 @@ class WatchServer:
 
                         if msg.get("role") == expected_role:
                             content = msg.get("content", [])
-                            # Track tool_use in subagent messages
-                            if isinstance(content, list):
-                                for item in content:
-                                    if isinstance(item, dict) and item.get("type") == "tool_use":
-                                        tool_id = item.get("id", "")
-                                        tool_name = item.get("name", "")
-                                        if tool_id and tool_name:
-                                            self._tool_use_to_name[tool_id] = tool_name
-                            rich = self._extractor._extract_rich_content(content, detailed=True)
-                            rich = self._extractor._fill_tool_names(rich, self._tool_use_to_name)
-                            text = rich.get("text", "") if isinstance(rich, dict) else str(rich)
-                            if text and text.strip():
+                            rich = self._extractor._extract_rich_content(
+                                content, detailed=True, tool_use_to_name=self._tool_use_to_name
+                            )
+                            if self._extractor._has_text(rich):
                                 return {
                                     "role": role_key,
                                     "content": rich,
@@ -449,25 +598,25 @@ class WatchServer:
             summary_escaped = escape_html(summary_text)
 
         id_attr = f' id="msg-{index}"' if index is not None else ""
-        parts = [
-            f'    <div class="message {role}"{id_attr}>\n',
-            f"        <div class=\"role\">{role_display}</div>\n",
-        ]
         if use_accordion:
-            parts.extend([
-                f'        <details class="message-accordion"{details_open}>\n',
-                f'            <summary>{summary_escaped}</summary>\n',
-                f'            <div class="content">{rendered}</div>\n',
-                f'        </details>\n',
-            ])
+            body_html = (
+                f'        <details class="message-accordion"{details_open}>\n'
+                f'            <summary>{summary_escaped}</summary>\n'
+                f'            <div class="content">{rendered}</div>\n'
+                '        </details>\n'
+            )
         else:
-            parts.append(f'        <div class="content">{rendered}</div>\n')
+            body_html = f'        <div class="content">{rendered}</div>\n'
+        usage_html = ""
         if msg.get("usage"):
-            parts.append(
-                f'        <div class="token-usage">📊 {self._extractor._format_usage_line(msg["usage"], msg.get("model"))}</div>\n'
-            )
-        parts.append(f"    </div>\n")
-        return "".join(parts)
+            usage_line = self._extractor._format_usage_line(msg["usage"], msg.get("model"))
+            usage_html = f'        <div class="token-usage">📊 {usage_line}</div>\n'
+        # One fixed-shape template, as in save_as_html, instead of a list of parts
+        return (
+            f'    <div class="message {role}"{id_attr}>\n'
+            f'        <div class="role">{role_display}</div>\n'
+            f'{body_html}{usage_html}    </div>\n'
+        )
 
     # ------------------------------------------------------------------ #
     # File loading
@@ -481,53 +630,93 @@ class WatchServer:
         conversation = []
         self._tool_use_to_name = {}
         self._tool_use_to_subagent_type = {}
+        self._last_offset = 0
+        self._last_size = 0
+        self._residual = b""
 
         try:
-            with open(self.jsonl_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    stripped = line.strip()
-                    if not stripped:
-                        continue
-                    try:
-                        entry = json.loads(stripped)
-                        msg = self._parse_entry(entry)
-                        if msg:
-                            conversation.append(msg)
-                    except Exception:
-                        continue
-                self._last_offset = f.tell()
+            f = self._session_file()
+            self._last_size = os.fstat(f.fileno()).st_size
+            f.seek(0)
+            for entry in self._read_entries(f):
+                try:
+                    msg = self._parse_entry(entry)
+                    if msg:
+                        conversation.append(msg)
+                except Exception:
+                    continue
         except Exception as e:
             print(f"❌ Error reading {self.jsonl_path}: {e}")
-
-        try:
-            self._last_size = self.jsonl_path.stat().st_size
-        except Exception:
-            self._last_size = self._last_offset
+        finally:
+            self._release_session_file()
 
         return conversation
 
+    def _session_file(self) -> BinaryIO:
+        """
+        Return the open session file, reopening it if the path now refers to a
+        different file (replaced) or it shrank below _last_offset (truncated or
+        rewritten), in which case it is read again from the start.
+        """
+        st = os.stat(self.jsonl_path)
+        f = self._fh
+        if f is not None:
+            if os.fstat(f.fileno()).st_ino == st.st_ino and st.st_size >= self._last_offset:
+                return f
+            f.close()
+        self._fh = f = open(self.jsonl_path, "rb", buffering=_READ_BUFFER_SIZE)
+        if st.st_size < self._last_offset:
+            self._last_offset = 0
+            self._residual = b""
+        return f
+
+    def _release_session_file(self) -> None:
+        """Close the session file after a read where it is not kept open (Windows)."""
+        if not _KEEP_SESSION_FILE_OPEN and self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def _read_entries(self, f: BinaryIO) -> Iterator[dict]:
+        """
+        Yield the JSON entries of the lines read from f (binary, positioned at
+        _last_offset), advancing _last_offset past every byte read.
+
+        A trailing line that is not complete JSON yet is kept in _residual and
+        joined with the bytes appended after it, so a writer flushing mid-line
+        does not lose that entry. Complete lines whose type _parse_entry never
+        handles (file-history snapshots, summaries, ...) are skipped unparsed.
+        """
+        gate = _MESSAGE_TYPE_RE.search
+        for line in f:
+            self._last_offset += len(line)
+            if self._residual:
+                line = self._residual + line
+                self._residual = b""
+            if line.endswith(b"\n") and gate(line) is None:
+                continue
+            stripped = line.strip()
+            if not stripped:
+                continue
+            try:
+                entry = _json_loads(stripped)
+            except ValueError:
+                if not line.endswith(b"\n"):
+                    self._residual = line
+                continue
+            yield entry
+
     # ------------------------------------------------------------------ #
     # HTML building
     # ------------------------------------------------------------------ #
 
 
-    def _build_initial_html(self, conversation: list) -> str:
+    def _build_initial_html(self, conversation: list) -> bytes:
         session_id = self.jsonl_path.stem
         messages_html = "".join(self._render_message_html(m, i) for i, m in enumerate(conversation))
         sidebar_nav = build_sidebar_nav(conversation)
         totals = self._extractor._sum_usage(conversation)
 
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Claude Watch \u2014 {session_id[:8]}</title>
-    <style>{_CSS}
-    </style>
-</head>
-<body>
-    <div class="app-layout">
+        body = f"""    <div class="app-layout">
         <main class="content-area">
     <div class="header">
         <h1>Claude Conversation \u2014 Live View</h1>
@@ -547,122 +736,110 @@ class WatchServer:
             {sidebar_nav}
         </nav>
     </div>
-    <div id="status-bar">\U0001f7e2 Connected</div>
-    <script>
-        const es = new EventSource('/events');
-        const statusBar = document.getElementById('status-bar');
-        es.onmessage = function(e) {{
-            const html = JSON.parse(e.data);
-            const isAtBottom = (window.innerHeight + window.scrollY) >= document.body.offsetHeight - 100;
-            document.getElementById('messages').insertAdjacentHTML('beforeend', html);
-            if (isAtBottom) {{
-                window.scrollTo(0, document.body.scrollHeight);
-            }}
-        }};
-        es.onerror = function() {{
-            statusBar.textContent = '\U0001f534 Disconnected \u2014 reload to reconnect';
-        }};
-        es.onopen = function() {{
-            statusBar.textContent = '\U0001f7e2 Connected';
-        }};
-        (function() {{
-            const links = document.querySelectorAll('.sidebar .nav-link');
-            const messages = document.querySelectorAll('.message[id^="msg-"]');
-            const headerOffset = 80;
-            let lastActiveIdx = -1;
-            let updateScheduled = false;
-
-            // Cache nav indices on load (static data)
-            const navIndices = [];
-            links.forEach(function(a) {{
-                const href = a.getAttribute('href');
-                if (href && href.startsWith('#msg-')) {{
-                    navIndices.push(parseInt(href.replace('#msg-', ''), 10));
-                }}
-            }});
-            navIndices.sort(function(a, b) {{ return a - b; }});
-
-            function updateActive() {{
-                updateScheduled = false;
-                let currentIdx = -1;
-                let minDist = Infinity;
-                messages.forEach(function(m) {{
-                    const rect = m.getBoundingClientRect();
-                    const dist = Math.abs(rect.top - headerOffset);
-                    if (rect.top < window.innerHeight && rect.bottom > 0 && dist < minDist) {{
-                        minDist = dist;
-                        currentIdx = parseInt(m.id.replace('msg-', ''), 10);
-                    }}
-                }});
-                let activeIdx = -1;
-                for (let i = navIndices.length - 1; i >= 0; i--) {{
-                    if (navIndices[i] <= currentIdx) {{
-                        activeIdx = navIndices[i];
-                        break;
-                    }}
-                }}
-                if (currentIdx >= 0 && activeIdx < 0 && navIndices.length > 0) {{ activeIdx = navIndices[0]; }}
-
-                // Only update if changed (reduces DOM updates)
-                if (activeIdx !== lastActiveIdx) {{
-                    lastActiveIdx = activeIdx;
-                    links.forEach(function(a) {{
-                        a.classList.toggle('active', a.getAttribute('href') === '#msg-' + activeIdx);
-                    }});
-                }}
-            }}
-
-            // Throttle scroll updates to 100ms
-            window.addEventListener('scroll', function() {{
-                if (!updateScheduled) {{
-                    updateScheduled = true;
-                    requestAnimationFrame(updateActive);
-                }}
-            }}, {{ passive: true }});
-            window.addEventListener('load', updateActive);
-        }})();
-    </script>
-</body>
-</html>"""
+"""
+        return b"".join((
+            _PAGE_HEAD_PREFIX,
+            session_id[:8].encode("utf-8"),
+            _PAGE_HEAD_SUFFIX,
+            body.encode("utf-8", "replace"),
+            _PAGE_TAIL,
+        ))
 
     # ------------------------------------------------------------------ #
     # Background poll loop
     # ------------------------------------------------------------------ #
 
     def _poll_loop(self) -> None:
-        while True:
-            time.sleep(0.5)
+        if _watch_files is not None:
             try:
-                stat = self.jsonl_path.stat()
-                if stat.st_size != self._last_size:
-                    self._process_new_content()
+                self._watch_loop()
+                return
             except Exception:
-                pass
+                pass  # e.g. inotify watch limit reached: fall back to polling
+        while not self._stop.wait(_POLL_INTERVAL):
+            self._check_for_changes()
+
+    def _watch_loop(self) -> None:
+        """Process appends as the OS reports changes to the session file."""
+        target = self.jsonl_path.resolve()
+        target_str = str(target)
+        # Catch anything appended between _load_initial and the watch starting
+        self._check_for_changes()
+        # Watch the directory rather than the file: a per-file watch is lost when a
+        # writer replaces the file by rename. Only events for our file wake us.
+        for _changes in _watch_files(
+            str(target.parent),
+            watch_filter=lambda _change, path: path == target_str,
+            stop_event=self._stop,
+        ):
+            self._check_for_changes()
+
+    def _check_for_changes(self) -> None:
+        try:
+            stat = self.jsonl_path.stat()
+            if stat.st_size != self._last_size:
+                self._process_new_content()
+        except Exception:
+            pass
 
     def _process_new_content(self) -> None:
-        """Read newly appended lines, parse them, broadcast HTML fragments."""
+        """Read newly appended lines, parse them, queue the messages for rendering."""
         try:
-            with open(self.jsonl_path, "r", encoding="utf-8") as f:
-                f.seek(self._last_offset)
-                new_lines = f.readlines()
-                self._last_offset = f.tell()
-            self._last_size = self.jsonl_path.stat().st_size
-
-            for line in new_lines:
-                stripped = line.strip()
-                if not stripped:
-                    continue
+            # Binary mode: _last_offset is a byte offset, and lines are parsed one at a
+            # time as they are read rather than collected first
+            f = self._session_file()
+            self._last_size = os.fstat(f.fileno()).st_size
+            f.seek(self._last_offset)
+            for entry in self._read_entries(f):
                 try:
-                    entry = json.loads(stripped)
                     msg = self._parse_entry(entry)
-                    if msg:
-                        idx = self._message_count
-                        self._message_count += 1
-                        self._broadcast(self._render_message_html(msg, idx))
                 except Exception:
                     continue
+                if msg:
+                    self._render_q.put(msg)
         except Exception:
             pass
+        finally:
+            self._release_session_file()
+
+    def _render_loop(self) -> None:
+        """Render thread: turn queued messages into HTML and broadcast them."""
+        while not self._stop.is_set():
+            self._render_pending(timeout=_POLL_INTERVAL)
+
+    def _render_pending(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait up to timeout seconds (forever if None) for a queued message, then
+        render it and everything queued behind it and broadcast the HTML.
+
+        A burst of appended messages goes out as one event (one queue put per client
+        and one DOM insert in the page) rather than one event per message.
+        """
+        try:
+            msg = self._render_q.get(timeout=timeout)
+        except queue.Empty:
+            return
+        fragments: List[str] = []
+        batch_size = 0
+        while True:
+            try:
+                idx = self._message_count
+                self._message_count += 1
+                html = self._render_message_html(msg, idx)
+                fragments.append(html)
+                batch_size += len(html)
+            except Exception:
+                pass
+            if batch_size >= _BROADCAST_BATCH_SIZE:
+                self._broadcast("".join(fragments))
+                fragments.clear()
+                batch_size = 0
+            try:
+                msg = self._render_q.get_nowait()
+            except queue.Empty:
+                break
+        if fragments:
+            self._broadcast("".join(fragments))
 
     # ------------------------------------------------------------------ #
     # Server entry point
@@ -672,17 +849,27 @@ class WatchServer:
         """Load initial content, start HTTP server and poll thread, open browser."""
         print(f"\U0001f441  Loading: {self.jsonl_path}")
         conversation = self._load_initial()
-        self._message_count = len(conversation)
-        initial_html = self._build_initial_html(conversation)
+        loaded = self._message_count = len(conversation)
+        initial_body = self._build_initial_html(conversation)
+        # Only the rendered page is needed from here on; the parsed messages would
+        # otherwise stay referenced for as long as the server runs
+        del conversation
+        # The page never changes after load, so it is compressed once up front.
+        # /events is never compressed: gzip buffering would hold back events.
+        initial_gzip = gzip.compress(initial_body, compresslevel=6)
 
         server_self = self  # closure reference
 
         class _Handler(BaseHTTPRequestHandler):
             def do_GET(self):
                 if self.path == "/":
-                    body = initial_html.encode("utf-8")
+                    body = initial_body
                     self.send_response(200)
                     self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Vary", "Accept-Encoding")
+                    if _accepts_gzip(self.headers.get("Accept-Encoding", "")):
+                        body = initial_gzip
+                        self.send_header("Content-Encoding", "gzip")
                     self.send_header("Content-Length", str(len(body)))
                     self.end_headers()
                     self.wfile.write(body)
@@ -698,8 +885,7 @@ class WatchServer:
                     try:
                         while True:
                             try:
-                                data = sub_q.get(timeout=15)
-                                self.wfile.write(f"data: {data}\n\n".encode("utf-8"))
+                                self.wfile.write(sub_q.get(timeout=15))
                                 self.wfile.flush()
                             except queue.Empty:
                                 # Keep-alive comment to prevent proxy timeouts
@@ -717,14 +903,22 @@ class WatchServer:
             def log_message(self, format, *args):  # noqa: A002
                 pass  # Suppress HTTP access log noise
 
-        httpd = HTTPServer(("", self.port), _Handler)
+        # One thread per connection: each /events stream blocks its handler for the
+        # life of the page, so a single-threaded server would stall reloads and
+        # further tabs. Daemon threads let Ctrl+C exit with streams still open.
+        httpd = ThreadingHTTPServer(("", self.port), _Handler)
+        httpd.daemon_threads = True
 
+        # File reading and HTML rendering run on separate threads, so a burst of
+        # expensive messages does not delay noticing the next change
+        render_thread = threading.Thread(target=self._render_loop, daemon=True)
+        render_thread.start()
         poll_thread = threading.Thread(target=self._poll_loop, daemon=True)
         poll_thread.start()
 
         url = f"http://localhost:{self.port}"
         print(f"\U0001f310 Watch server: {url}")
-        print(f"   Messages loaded: {len(conversation)}")
+        print(f"   Messages loaded: {loaded}")
         print("Press Ctrl+C to stop...")
         _open_url(url)
 
@@ -732,4 +926,7 @@ class WatchServer:
             httpd.serve_forever()
         except KeyboardInterrupt:
             print("\n\U0001f44b Watch server stopped")
+            self._stop.set()
             httpd.shutdown()
+            if self._fh is not None:
+                self._fh.close()
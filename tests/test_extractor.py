@@ -1,11 +1,11 @@
 """Tests for Claude Conversation Extractor"""
 
 import json
+import os
 import sys
 import tempfile
 import unittest
 from pathlib import Path
-from unittest.mock import MagicMock, patch
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -90,6 +90,19 @@ class TestClaudeConversationExtractor(unittest.TestCase):
         self.assertIn("## 🤖 Claude", content)
         self.assertIn("Hello! How can I help?", content)
 
+    def test_save_recreates_removed_output_dir(self):
+        """Test a save after the output directory was deleted creates it again"""
+        import shutil
+
+        conversation = [{"role": "user", "content": "Hello", "timestamp": "2025-05-25T10:00:00Z"}]
+        shutil.rmtree(self.temp_dir)
+
+        for format in ("markdown", "json", "html"):
+            with self.subTest(format=format):
+                result = self.extractor.save_conversation(conversation, "test-session", format)
+                self.assertTrue(result.exists())
+                shutil.rmtree(self.temp_dir)
+
     def test_extract_conversation_valid_jsonl(self):
         """Test extracting conversation from valid JSONL"""
         # Create a temporary JSONL file
@@ -123,22 +136,318 @@ class TestClaudeConversationExtractor(unittest.TestCase):
         self.assertEqual(conversation[1]["role"], "assistant")
         self.assertEqual(conversation[1]["content"], "Test response")
 
+    def test_extract_multiple_parallel_export(self):
+        """Test batches large enough for worker processes export every session in order"""
+        import extract_claude_logs
+
+        sessions = []
+        for i in range(extract_claude_logs._PARALLEL_EXPORT_MIN_FILES + 1):
+            jsonl_file = Path(self.temp_dir) / f"export{i}-session.jsonl"
+            entry = {
+                "type": "user",
+                "message": {"role": "user", "content": f"Message {i}"},
+                "timestamp": "2025-05-25T10:00:00Z",
+            }
+            jsonl_file.write_text(json.dumps(entry) + "\n" if i != 2 else "")
+            sessions.append(jsonl_file)
+        indices = list(range(len(sessions))) + [99]
+
+        from unittest.mock import patch
+
+        with patch("builtins.print") as mock_print:
+            success, total = self.extractor.extract_multiple(sessions, indices, format="json")
+
+        self.assertEqual((success, total), (len(sessions) - 1, len(sessions) + 1))
+        printed = [call.args[0] for call in mock_print.call_args_list]
+        self.assertTrue(printed[0].startswith("✅ 1/"))
+        self.assertIn("Skipped session 3", printed[2])
+        self.assertIn("Invalid session number: 100", printed[-1])
+        self.assertEqual(len(list(Path(self.temp_dir).glob("*.json"))), len(sessions) - 1)
+
+    def test_extract_multiple_parallel_export_error_propagates(self):
+        """Test an export error in a worker is raised and no session is exported twice"""
+        from concurrent.futures import ThreadPoolExecutor
+        from unittest.mock import patch
+
+        import extract_claude_logs
+
+        sessions = [
+            Path(self.temp_dir) / f"fail{i}.jsonl"
+            for i in range(extract_claude_logs._PARALLEL_EXPORT_MIN_FILES + 2)
+        ]
+        exported = []
+
+        def export_session(extractor, path, format, detailed):
+            exported.append(path)
+            if path == sessions[1]:
+                raise OSError("No space left on device")
+            return 1, path
+
+        # Threads stand in for worker processes so the exports can be observed
+        with patch("concurrent.futures.ProcessPoolExecutor", ThreadPoolExecutor), patch.object(
+            ClaudeConversationExtractor, "_export_session", export_session
+        ), patch("builtins.print"):
+            with self.assertRaises(OSError):
+                self.extractor.extract_multiple(sessions, list(range(len(sessions))))
+
+        self.assertIn(sessions[1], exported)
+        self.assertEqual(len(exported), len(set(exported)))
+
+    def test_extract_conversation_lone_surrogate(self):
+        """Test a line the fast JSON parser rejects (truncated emoji) is still extracted"""
+        jsonl_file = Path(self.temp_dir) / "surrogate.jsonl"
+        entries = [
+            {"type": "user", "message": {"role": "user", "content": "cut off \ud83d"}},
+            {"type": "assistant", "message": {"role": "assistant", "content": "Reply"}},
+        ]
+        # json.dumps escapes the lone surrogate as \ud83d, as the logs do
+        jsonl_file.write_text("".join(json.dumps(entry) + "\n" for entry in entries))
+
+        conversation = self.extractor.extract_conversation(jsonl_file)
+
+        self.assertEqual([msg["role"] for msg in conversation], ["user", "assistant"])
+        self.assertEqual(conversation[0]["content"]["text"], "cut off \ud83d")
+
+    def test_extract_conversation_skips_non_message_entries(self):
+        """Test summary/snapshot lines are skipped and spaced JSON still parses"""
+        jsonl_file = Path(self.temp_dir) / "mixed.jsonl"
+        lines = [
+            json.dumps({"type": "summary", "summary": "user said hi"}),
+            json.dumps({"type": "file-history-snapshot", "snapshot": {}}),
+            '{"type" : "user", "message": {"role": "user", "content": "Hello"}}',
+        ]
+        jsonl_file.write_text("\n".join(lines) + "\n")
+
+        conversation = self.extractor.extract_conversation(jsonl_file)
+
+        self.assertEqual(len(conversation), 1)
+        self.assertEqual(conversation[0]["content"]["text"], "Hello")
+
+    def test_extract_conversation_non_string_tool_name(self):
+        """Test tool uses whose name or subagent type is not a string keep their message"""
+        jsonl_file = Path(self.temp_dir) / "odd_names.jsonl"
+        content = [
+            {"type": "text", "text": "Running tools"},
+            {"type": "tool_use", "id": "t1", "name": 123, "input": {}},
+            {"type": "tool_use", "id": "t2", "name": "Task",
+             "input": {"subagent_type": {"kind": "explore"}}},
+        ]
+        entry = {"type": "assistant", "message": {"role": "assistant", "content": content}}
+        jsonl_file.write_text(json.dumps(entry) + "\n")
+
+        for detailed in (False, True):
+            with self.subTest(detailed=detailed):
+                conversation = self.extractor.extract_conversation(jsonl_file, detailed=detailed)
+                self.assertEqual(len(conversation), 1)
+                self.assertIn("Running tools", conversation[0]["content"]["text"])
+
+    def test_type_gates_cover_entry_handlers(self):
+        """Test the byte-level prefilters never drop an entry type that has a handler"""
+        import extract_claude_logs
+
+        extractor_cls = ClaudeConversationExtractor
+        gates = [
+            (extract_claude_logs._MESSAGE_TYPE_RE, extractor_cls._ENTRY_HANDLERS),
+            (extract_claude_logs._DETAILED_TYPE_RE, extractor_cls._DETAILED_ENTRY_HANDLERS),
+        ]
+        for gate, handlers in gates:
+            for entry_type in handlers:
+                with self.subTest(entry_type=entry_type):
+                    self.assertIsNotNone(gate.search(json.dumps({"type": entry_type}).encode()))
+
+    def test_iter_conversation_streams_messages(self):
+        """Test iter_conversation is lazy and yields the extract_conversation messages"""
+        jsonl_file = Path(self.temp_dir) / "stream.jsonl"
+        with open(jsonl_file, "w") as f:
+            for i in range(3):
+                entry = {"type": "user", "message": {"role": "user", "content": f"Message {i}"}}
+                f.write(json.dumps(entry) + "\n")
+
+        stream = self.extractor.iter_conversation(jsonl_file)
+
+        self.assertNotIsInstance(stream, list)
+        self.assertEqual(list(stream), self.extractor.extract_conversation(jsonl_file))
+
+    def test_get_conversation_preview_counts_all_lines(self):
+        """Test the preview is the first real user text and every line is counted"""
+        jsonl_file = Path(self.temp_dir) / "preview.jsonl"
+        lines = [json.dumps({"type": "summary", "summary": "s"})]
+        for i in range(5):
+            message = {"role": "user", "content": f"<tag>Question {i}</tag>"}
+            entry = {"type": "user", "message": message}
+            lines.append(json.dumps(entry))
+        jsonl_file.write_text("\n".join(lines) + "\n")
+
+        preview, count = self.extractor.get_conversation_preview(jsonl_file)
+
+        self.assertEqual(preview, "Question 0")
+        self.assertEqual(count, 6)
+
+    def test_get_conversation_preview_skips_noise(self):
+        """Test tool results, interruptions and continuation notices are not previews"""
+        jsonl_file = Path(self.temp_dir) / "noise.jsonl"
+        texts = [
+            "tool_use_id: toolu_01",
+            "[Request interrupted by user]",
+            "This Session Is Being Continued from a previous conversation",
+            "Real question",
+        ]
+        lines = []
+        for text in texts:
+            message = {"role": "user", "content": [{"type": "text", "text": text}]}
+            lines.append(json.dumps({"type": "user", "message": message}))
+        jsonl_file.write_text("\n".join(lines) + "\n")
+
+        preview, count = self.extractor.get_conversation_preview(jsonl_file)
+
+        self.assertEqual(preview, "Real question")
+        self.assertEqual(count, 4)
+
+    def test_preview_many_matches_serial_previews(self):
+        """Test parallel previews come back in input order and match the serial result"""
+        import extract_claude_logs
+
+        paths = []
+        for i in range(extract_claude_logs._PARALLEL_PREVIEW_MIN_FILES):
+            jsonl_file = Path(self.temp_dir) / f"preview{i}.jsonl"
+            entry = {"type": "user", "message": {"role": "user", "content": f"Question {i}"}}
+            jsonl_file.write_text(json.dumps(entry) + "\n" * (i % 3 + 1))
+            paths.append(jsonl_file)
+
+        results = self.extractor.preview_many(paths, max_workers=2)
+
+        self.assertEqual(results, [self.extractor.get_conversation_preview(p) for p in paths])
+
+    def test_render_image_html_escapes_invalid_base64(self):
+        """Test base64 image data is embedded as-is but escaped if it is not base64"""
+        image = {"type": "image", "source": {"data": "QUJD+/=="}, "has_full_data": True}
+        html = self.extractor._render_image_html(image)
+        self.assertIn('src="data:image/jpeg;base64,QUJD+/=="', html)
+
+        image["source"]["data"] = 'x" onerror="alert(1)'
+        html = self.extractor._render_image_html(image)
+        self.assertNotIn('onerror="', html)
+        self.assertIn("x&quot; onerror=&quot;alert(1)", html)
+
+        image = {"type": "image", "data_url": "data:image/png;base64,QUJD"}
+        html = self.extractor._render_image_html(image)
+        self.assertIn('src="data:image/png;base64,QUJD"', html)
+
+        image["data_url"] = 'data:image/png;base64,QUJD"><script>'
+        html = self.extractor._render_image_html(image)
+        self.assertNotIn("<script>", html)
+
+    def test_part_renderers_cover_same_types(self):
+        """Test HTML and Markdown renderers handle the same part types"""
+        self.assertEqual(
+            set(ClaudeConversationExtractor._HTML_PART_RENDERERS),
+            set(ClaudeConversationExtractor._MARKDOWN_PART_RENDERERS),
+        )
+        content = {"parts": [{"type": "unknown"}], "text": "fallback"}
+        self.assertEqual(self.extractor._render_content_to_markdown(content), "fallback")
+
+    def test_display_conversation_uses_given_messages(self):
+        """Test display_conversation shows passed-in messages without reading the file"""
+        import io
+        from unittest.mock import patch
+
+        missing = Path(self.temp_dir) / "never-written.jsonl"
+        conversation = [{"role": "user", "content": "cached question", "timestamp": ""}]
+        with patch("sys.stdout", new_callable=io.StringIO) as out, patch(
+            "builtins.input", return_value=""
+        ):
+            self.extractor.display_conversation(missing, conversation=conversation)
+        self.assertIn("cached question", out.getvalue())
+        self.assertIn("End of conversation", out.getvalue())
+
+    def test_split_timestamp(self):
+        """Test ISO timestamps split into date and time, and bad input gives None"""
+        import extract_claude_logs
+
+        split = extract_claude_logs._split_timestamp
+        self.assertEqual(split("2025-05-25T10:00:01.123Z"), ("2025-05-25", "10:00:01"))
+        self.assertEqual(split("2025-05-25"), ("2025-05-25", "00:00:00"))
+        self.assertIsNone(split(""))
+        self.assertIsNone(split("not a date"))
+
+    def test_save_as_json_matches_stdlib_encoding(self):
+        """Test the JSON export is json.dumps output apart from orjson's exponent form"""
+        import extract_claude_logs
+
+        conversation = [
+            {"role": "user", "content": "Héllo 😀 </script>", "timestamp": "2025-05-25T10:00:00Z"},
+            {"role": "assistant", "content": {"text": "Hi", "score": 1e16, "empty": []}},
+        ]
+        result = self.extractor.save_as_json(conversation, "test-session-id")
+
+        data = result.read_bytes()
+        expected = json.dumps(json.loads(data), indent=2, ensure_ascii=False)
+        if extract_claude_logs.orjson is not None:
+            expected = expected.replace("1e+16", "1e16")
+        self.assertEqual(data, expected.encode("utf-8"))
+
+    def test_json_dumps_pretty_floats(self):
+        """Test pretty JSON keeps NaN/Infinity and only differs from json.dumps in exponent form"""
+        import extract_claude_logs
+
+        non_finite = {"a": [float("nan"), float("inf"), -float("inf")], "b": None}
+        expected = json.dumps(non_finite, indent=2, ensure_ascii=False)
+        self.assertEqual(extract_claude_logs._json_dumps_pretty(non_finite), expected)
+        self.assertEqual(
+            extract_claude_logs._json_dumps_pretty_bytes(non_finite), expected.encode("utf-8")
+        )
+
+        # Accepted difference: orjson writes exponents without sign padding
+        exponents = extract_claude_logs._json_dumps_pretty([1e100, 1e-7, "é"])
+        if extract_claude_logs.orjson is not None:
+            self.assertEqual(exponents, '[\n  1e100,\n  1e-7,\n  "é"\n]')
+        else:
+            self.assertEqual(exponents, '[\n  1e+100,\n  1e-07,\n  "é"\n]')
+        self.assertEqual(json.loads(exponents), [1e100, 1e-7, "é"])
+
+    def test_format_json_if_valid_stdlib_only_json(self):
+        """Test tool output with NaN or a lone surrogate is still pretty-printed as JSON"""
+        formatted = self.extractor._format_json_if_valid('{"a": NaN, "b": "\\ud83d"}')
+        self.assertEqual(formatted, '```json\n{\n  "a": NaN,\n  "b": "\ud83d"\n}\n```')
+
+    def test_fast_parse_args_matches_argparse(self):
+        """Test the argparse-free CLI fast path agrees with the full parser"""
+        from unittest.mock import patch
+
+        import extract_claude_logs
+
+        for argv in (
+            [], ["--list"], ["--logs"], ["--extract", "1,3"], ["--recent", "5"],
+            ["--extract", "2", "--format", "markdown"], ["--all", "--format", "json"],
+        ):
+            with self.subTest(argv=argv), patch("sys.argv", ["prog"] + argv):
+                self.assertEqual(
+                    vars(extract_claude_logs._fast_parse_args(argv)),
+                    vars(extract_claude_logs._parse_args()),
+                )
+        for argv in (
+            ["--recent", "x"], ["--recent", "²"], ["--list", "--limit", "3"], ["--help"],
+            ["--extract", "1", "--format", "pdf"], ["--extract", "--format", "json"],
+        ):
+            with self.subTest(argv=argv):
+                self.assertIsNone(extract_claude_logs._fast_parse_args(argv))
+
     def test_extract_conversation_invalid_file(self):
         """Test extracting conversation from non-existent file"""
         fake_path = Path(self.temp_dir) / "non_existent.jsonl"
         conversation = self.extractor.extract_conversation(fake_path)
         self.assertEqual(conversation, [])
 
-    @patch("extract_claude_logs.Path.rglob")
-    def test_find_sessions(self, mock_rglob):
+    def test_find_sessions(self):
         """Test finding session files"""
-        # Mock some session files
-        mock_files = [
-            MagicMock(stat=MagicMock(return_value=MagicMock(st_mtime=1000))),
-            MagicMock(stat=MagicMock(return_value=MagicMock(st_mtime=2000))),
-            MagicMock(stat=MagicMock(return_value=MagicMock(st_mtime=1500))),
-        ]
-        mock_rglob.return_value = mock_files
+        project_dir = Path(self.temp_dir) / "projects" / "project"
+        (project_dir / "nested").mkdir(parents=True)
+        for name, mtime in [("a.jsonl", 1000), ("b.jsonl", 2000), ("nested/c.jsonl", 1500)]:
+            session = project_dir / name
+            session.write_text("{}\n")
+            os.utime(session, (mtime, mtime))
+        (project_dir / "notes.txt").write_text("ignored")
+        self.extractor.claude_dir = Path(self.temp_dir) / "projects"
 
         sessions = self.extractor.find_sessions()
 
@@ -147,6 +456,45 @@ class TestClaudeConversationExtractor(unittest.TestCase):
         self.assertEqual(sessions[0].stat().st_mtime, 2000)
         self.assertEqual(sessions[1].stat().st_mtime, 1500)
         self.assertEqual(sessions[2].stat().st_mtime, 1000)
+        self.assertEqual(
+            sorted(self.extractor.find_sessions(sort=False)), sorted(sessions)
+        )
+        self.assertEqual(self.extractor.find_sessions(limit=2), sessions[:2])
+
+    def test_main_all_uses_list_order(self):
+        """Test --all exports sessions in the same newest-first order --list numbers them"""
+        from unittest.mock import patch
+
+        import extract_claude_logs
+
+        sessions = [Path(self.temp_dir) / f"s{i}.jsonl" for i in range(3)]
+        with patch("sys.argv", ["prog", "--all"]), patch.object(
+            ClaudeConversationExtractor, "find_sessions", return_value=sessions
+        ) as mock_find, patch.object(
+            ClaudeConversationExtractor, "extract_multiple", return_value=(3, 3)
+        ) as mock_extract, patch("builtins.print"):
+            extract_claude_logs.main()
+
+        mock_find.assert_called_once_with()
+        self.assertEqual(mock_extract.call_args[0][:2], (sessions, [0, 1, 2]))
+
+    def test_find_session_by_id_and_subagent_file(self):
+        """Test locating a session and its subagent log by ID"""
+        projects = Path(self.temp_dir) / "projects"
+        subagents = projects / "project" / "sess-1" / "subagents"
+        subagents.mkdir(parents=True)
+        (projects / "project" / "sess-1.jsonl").write_text("{}\n")
+        (subagents / "agent-abc.jsonl").write_text("{}\n")
+        self.extractor.claude_dir = projects
+
+        self.assertEqual(
+            self.extractor.find_session_by_id("sess-1"), projects / "project" / "sess-1.jsonl"
+        )
+        self.assertIsNone(self.extractor.find_session_by_id("missing"))
+        self.assertEqual(
+            self.extractor._find_subagent_file("sess-1", "abc"), subagents / "agent-abc.jsonl"
+        )
+        self.assertIsNone(self.extractor._find_subagent_file("other", "abc"))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+"""Tests for HTML utilities"""
+
+import sys
+import unittest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.html_utils import escape_html  # noqa: E402
+from utils.ui_utils import get_nav_label  # noqa: E402
+
+
+class TestEscapeHtml(unittest.TestCase):
+    """Test suite for escape_html"""
+
+    def test_escapes_special_characters(self):
+        """Test all five special characters map to their entities"""
+        self.assertEqual(
+            escape_html("<a href=\"x\" title='y'>&</a>"),
+            "&lt;a href=&quot;x&quot; title=&#x27;y&#x27;&gt;&amp;&lt;/a&gt;",
+        )
+
+    def test_ampersand_escaped_once(self):
+        """Test existing entities are escaped, not passed through"""
+        self.assertEqual(escape_html("&amp;"), "&amp;amp;")
+
+    def test_clean_text_returned_unchanged(self):
+        """Test text without special characters comes back as the same object"""
+        text = "plain output with no markup " * 100
+        self.assertIs(escape_html(text), text)
+        self.assertEqual(escape_html(""), "")
+
+
+class TestGetNavLabel(unittest.TestCase):
+    """Test suite for get_nav_label"""
+
+    def test_subagent_label_uses_type(self):
+        """Test subagent messages are labelled with their upper-cased type"""
+        msg = {"role": "subagent_user", "metadata": {"subagent_type": "explore"}}
+        self.assertEqual(get_nav_label(msg), "🤖 Subagent (EXPLORE) - User")
+
+    def test_subagent_label_unhashable_agent_id(self):
+        """Test a malformed, unhashable agent id still produces a label"""
+        msg = {"role": "subagent_assistant", "metadata": {"agent_id": ["a"]}}
+        self.assertEqual(get_nav_label(msg), "🤖 Subagent (['a']...) - Assistant")
+
+
+if __name__ == "__main__":
+    unittest.main()
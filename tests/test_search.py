@@ -111,6 +111,18 @@ class TestConversationSearcher(unittest.TestCase):
         # Context is highlighted with ** markers and uppercase
         self.assertIn("**PYTHON ERRORS**", results[0].context)
 
+    def test_search_line_with_lone_surrogate(self):
+        """Test lines the fast JSON parser rejects (truncated emoji) are still searched"""
+        entry = {"type": "user", "content": "Truncated emoji \ud83d here"}
+        with open(self.test_file, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+        results = self.searcher.search(
+            "Truncated emoji", search_dir=self.test_dir, mode="exact"
+        )
+
+        self.assertEqual(len(results), 1)
+
     def test_search_smart_mode(self):
         """Test smart search with partial matches"""
         results = self.searcher.search(
@@ -129,6 +141,20 @@ class TestConversationSearcher(unittest.TestCase):
         self.assertEqual(len(results), 1)
         self.assertIn("try-except", results[0].context)
 
+    def test_search_regex_mode_precompiled_and_invalid(self):
+        """Test regex mode accepts a compiled pattern and reports a bad one once"""
+        import re
+
+        results = self.searcher.search(
+            re.compile(r"try.*except"), search_dir=self.test_dir, mode="regex"
+        )
+        self.assertEqual(len(results), 1)
+
+        with patch("builtins.print") as mock_print:
+            results = self.searcher.search("try(", search_dir=self.test_dir, mode="regex")
+        self.assertEqual(results, [])
+        mock_print.assert_called_once()
+
     def test_search_speaker_filter(self):
         """Test filtering by speaker"""
         # Search human messages only
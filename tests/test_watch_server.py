@@ -0,0 +1,183 @@
+"""Tests for the --watch live view server"""
+
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from watch_server import WatchServer  # noqa: E402
+
+
+def _user_line(text):
+    """One JSONL user entry, newline-terminated, as bytes"""
+    entry = {"type": "user", "message": {"role": "user", "content": text}}
+    return (json.dumps(entry) + "\n").encode("utf-8")
+
+
+def _event_data(frame):
+    """Join the data: lines of one queued SSE frame, as the browser does"""
+    assert frame.endswith(b"\n\n")
+    lines = frame.decode("utf-8")[:-2].split("\n")
+    assert all(line.startswith("data: ") for line in lines)
+    return "\n".join(line[len("data: "):] for line in lines)
+
+
+class TestWatchServer(unittest.TestCase):
+    """Test incremental reading and SSE fan-out"""
+
+    def setUp(self):
+        """Create a session file with one message and load it"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = Path(self.temp_dir) / "session.jsonl"
+        self.path.write_bytes(_user_line("first"))
+        self.server = WatchServer(self.path)
+        self.server._message_count = len(self.server._load_initial())
+        self.events = self.server._subscribe()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if self.server._fh is not None:
+            self.server._fh.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _append(self, data):
+        with open(self.path, "ab") as f:
+            f.write(data)
+
+    def _received(self):
+        self.server._render_pending(timeout=0)
+        received = []
+        while not self.events.empty():
+            received.append(_event_data(self.events.get_nowait()))
+        return received
+
+    def test_appended_message_is_broadcast(self):
+        """Test a newly appended line is rendered and sent with the next message id"""
+        self._append(_user_line("second"))
+        self.server._process_new_content()
+
+        received = self._received()
+        self.assertEqual(len(received), 1)
+        self.assertIn('id="msg-1"', received[0])
+        self.assertIn("second", received[0])
+        self.assertTrue(received[0].startswith('    <div class="message user"'))
+        self.assertTrue(received[0].endswith("    </div>\n"))
+        self.assertEqual(self.server._last_offset, self.path.stat().st_size)
+
+    def test_line_with_lone_surrogate_is_broadcast(self):
+        """Test a line the fast JSON parser rejects (truncated emoji) still reaches clients"""
+        self._append(_user_line("cut off \ud83d"))
+        self.server._process_new_content()
+
+        received = self._received()
+        self.assertEqual(len(received), 1)
+        self.assertIn("cut off", received[0])
+
+    def test_non_string_subagent_type_is_kept(self):
+        """Test a Task call whose subagent_type is not a string is still broadcast"""
+        content = [
+            {"type": "text", "text": "Delegating"},
+            {"type": "tool_use", "id": "t1", "name": "Task",
+             "input": {"subagent_type": {"kind": "explore"}}},
+            {"type": "tool_use", "id": "t2", "name": "Task",
+             "input": {"subagent_type": "explore"}},
+        ]
+        entry = {"type": "assistant", "message": {"role": "assistant", "content": content}}
+        self._append((json.dumps(entry) + "\n").encode("utf-8"))
+        self.server._process_new_content()
+
+        received = self._received()
+        self.assertEqual(len(received), 1)
+        self.assertIn("Delegating", received[0])
+        self.assertEqual(self.server._tool_use_to_subagent_type["t1"], {"kind": "explore"})
+        self.assertIs(self.server._tool_use_to_subagent_type["t2"], sys.intern("explore"))
+
+    def test_burst_of_messages_is_one_event(self):
+        """Test lines appended together are sent as a single event, in order"""
+        self._append(_user_line("second") + _user_line("third"))
+        self.server._process_new_content()
+
+        received = self._received()
+        self.assertEqual(len(received), 1)
+        self.assertLess(received[0].index('id="msg-1"'), received[0].index('id="msg-2"'))
+
+    def test_line_split_across_writes_is_not_lost(self):
+        """Test a line flushed in two pieces is broadcast once, when complete"""
+        line = _user_line("split message")
+        self._append(line[:25])
+        self.server._process_new_content()
+        self.assertEqual(self._received(), [])
+
+        self._append(line[25:])
+        self.server._process_new_content()
+        received = self._received()
+        self.assertEqual(len(received), 1)
+        self.assertIn("split message", received[0])
+
+    def test_initial_load_keeps_partial_last_line(self):
+        """Test a half-written last line at load time is picked up once finished"""
+        line = _user_line("late")
+        self._append(line[:25])
+        self.assertEqual(len(self.server._load_initial()), 1)
+
+        self._append(line[25:])
+        self.server._process_new_content()
+        received = self._received()
+        self.assertEqual(len(received), 1)
+        self.assertIn("late", received[0])
+
+    def test_unterminated_complete_last_line_is_loaded(self):
+        """Test a final line without a newline still loads if it is complete JSON"""
+        self._append(_user_line("no newline").rstrip(b"\n"))
+        self.assertEqual(len(self.server._load_initial()), 2)
+
+    def test_rewritten_shorter_file_is_read_from_start(self):
+        """Test a truncated or replaced session file is followed from its beginning"""
+        self._append(_user_line("second"))
+        self.server._process_new_content()
+        self._received()
+
+        replacement = Path(self.temp_dir) / "replacement.jsonl"
+        replacement.write_bytes(_user_line("restarted"))
+        replacement.replace(self.path)
+        self.server._process_new_content()
+        received = self._received()
+        self.assertEqual(len(received), 1)
+        self.assertIn("restarted", received[0])
+
+    def test_session_file_closed_between_reads_on_windows(self):
+        """Test the session file is not held open between reads where that blocks the writer"""
+        from unittest.mock import patch
+
+        import watch_server
+
+        with patch.object(watch_server, "_KEEP_SESSION_FILE_OPEN", False):
+            self._append(_user_line("second"))
+            self.server._process_new_content()
+            self.assertIsNone(self.server._fh)
+            self._append(_user_line("third"))
+            self.server._process_new_content()
+            self.assertIsNone(self.server._fh)
+
+        received = self._received()
+        self.assertEqual(len(received), 1)
+        self.assertIn("second", received[0])
+        self.assertIn("third", received[0])
+
+    def test_slow_subscriber_drops_oldest(self):
+        """Test a full subscriber queue keeps the newest messages"""
+        import watch_server
+
+        for i in range(watch_server._SUBSCRIBER_QUEUE_SIZE + 10):
+            self.server._broadcast(str(i))
+        self.assertEqual(self.events.qsize(), watch_server._SUBSCRIBER_QUEUE_SIZE)
+        self.assertEqual(_event_data(self.events.get_nowait()), "10")
+
+
+if __name__ == "__main__":
+    unittest.main()